@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Concurrent Exposure Analyzer
+Measures how much capital the bots have open at the same time and whether
+simultaneous positions of different bots win or lose together.
+
+The whole analysis is a single sweep over the sorted open/close events
+(O(n log n)); trades are never compared pairwise.
+
+Features:
+- Open-positions and notional-exposure time series (global and per bot)
+- Peak concurrency and peak notional, with their timestamps
+- Per bot pair: overlap time and duration-weighted correlation of the PnL
+  of the positions they hold simultaneously
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from analyze_trading_bots import analyze_trading_performance
+from journal_loader import get_bot_config, load_journals
+
+# Open PnL is a running sum of +pnl/-pnl events; rounding to this many
+# decimals (well below the journals' precision) removes float residuals
+PNL_DECIMALS = 8
+
+
+def build_intervals_from_journal(df):
+    """
+    Build position intervals from a Phase 3/4 journal (`Date E` / `Date S`).
+
+    Journals do not record size, so notional is the bot's configured
+    position size.
+    """
+    notional = df['Bot'].map(lambda b: (get_bot_config(b) or {}).get('position_size', np.nan))
+    return pd.DataFrame({
+        'Bot': df['Bot'],
+        'Open': df['Entry_Time'],
+        'Close': df['Exit_Time'],
+        'Notional': notional,
+        'PnL': df['PnL_Net'],
+    })
+
+
+def build_intervals_from_export(df):
+    """
+    Build position intervals from a classified Bitget export
+    (`Opening time` / `Closed time`, see analyze_trading_performance).
+    """
+    return pd.DataFrame({
+        'Bot': df['Bot'],
+        'Open': df['Opening_Time'],
+        'Close': df['Closing_Time'],
+        'Notional': df['Closed_Value_Numeric'],
+        'PnL': df['Net_PnL'],
+    })
+
+
+def sweep_exposure(intervals):
+    """
+    Sweep the open/close events once and rebuild the exposure state.
+
+    Closes are processed before opens at the same timestamp, so a position
+    closed at 12:00 does not overlap one opened at 12:00.
+
+    Args:
+        intervals: DataFrame with Bot, Open, Close, Notional, PnL
+
+    Returns:
+        Dictionary with:
+        - 'timeline': state after each distinct event time (open positions,
+          notional, per-bot open counts)
+        - 'segments': elementary time segments with their duration and the
+          per-bot open count / open PnL sum
+        - 'bots': ordered bot names
+        - 'dropped': number of invalid intervals skipped
+    """
+    valid = (intervals['Open'].notna() & intervals['Close'].notna()
+             & (intervals['Close'] >= intervals['Open']))
+    iv = intervals[valid].reset_index(drop=True)
+    bots, bot_codes = np.unique(iv['Bot'].astype(str).to_numpy(), return_inverse=True)
+    n, n_bots = len(iv), len(bots)
+
+    # Events: +1 at open, -1 at close
+    times = np.concatenate([iv['Open'].to_numpy('datetime64[ns]'), iv['Close'].to_numpy('datetime64[ns]')])
+    delta = np.concatenate([np.ones(n, dtype=np.int64), -np.ones(n, dtype=np.int64)])
+    codes = np.concatenate([bot_codes, bot_codes])
+    notional = np.nan_to_num(iv['Notional'].to_numpy(dtype=float))
+    pnl = np.nan_to_num(iv['PnL'].to_numpy(dtype=float))
+
+    order = np.lexsort((delta, times))
+    times, delta, codes = times[order], delta[order], codes[order]
+    notional_delta = np.concatenate([notional, -notional])[order]
+    pnl_delta = np.concatenate([pnl, -pnl])[order]
+
+    # Running state after each event
+    open_positions = np.cumsum(delta)
+    open_notional = np.cumsum(notional_delta)
+
+    per_bot_delta = np.zeros((2 * n, n_bots), dtype=np.int64)
+    per_bot_delta[np.arange(2 * n), codes] = delta
+    per_bot_open = np.cumsum(per_bot_delta, axis=0)
+
+    per_bot_pnl_delta = np.zeros((2 * n, n_bots))
+    per_bot_pnl_delta[np.arange(2 * n), codes] = pnl_delta
+    # Rounded so a bot with nothing open is exactly 0 (no -1e-15 residuals)
+    per_bot_pnl = np.round(np.cumsum(per_bot_pnl_delta, axis=0), PNL_DECIMALS)
+
+    # Keep the state after the last event of each distinct timestamp
+    last = np.ones(2 * n, dtype=bool)
+    last[:-1] = times[1:] != times[:-1]
+    t = times[last]
+
+    timeline = pd.DataFrame({
+        'Time': t,
+        'Open_Positions': open_positions[last],
+        'Notional': open_notional[last],
+    })
+    for i, bot in enumerate(bots):
+        timeline[f'Open_{bot}'] = per_bot_open[last, i]
+
+    # Segment i is [t_i, t_i+1) with the state left by the events at t_i
+    duration = (np.diff(t) / np.timedelta64(1, 'h')).astype(float)
+    segments = {
+        'Start': t[:-1],
+        'Hours': duration,
+        'Open': per_bot_open[last][:-1],
+        'PnL': per_bot_pnl[last][:-1],
+    }
+
+    return {
+        'timeline': timeline,
+        'segments': segments,
+        'bots': list(bots),
+        'dropped': int((~valid).sum()),
+    }
+
+
+def weighted_corr(x, y, w):
+    """Weighted Pearson correlation (NaN when undefined)."""
+    if w.sum() <= 0 or len(x) < 2:
+        return np.nan
+    mx, my = np.average(x, weights=w), np.average(y, weights=w)
+    cov = np.average((x - mx) * (y - my), weights=w)
+    vx = np.average((x - mx) ** 2, weights=w)
+    vy = np.average((y - my) ** 2, weights=w)
+    if vx <= 0 or vy <= 0:
+        return np.nan
+    return cov / np.sqrt(vx * vy)
+
+
+def pair_overlap_stats(sweep):
+    """
+    Compare every bot pair on the segments where both hold positions.
+
+    For each segment, a bot's exposure outcome is the average final PnL of
+    its open positions. The pair correlation is weighted by segment
+    duration, and 'Both_Losing' is the share of overlap time during which
+    both bots' open positions are net losers.
+
+    Returns:
+        DataFrame with one row per bot pair
+    """
+    seg, bots = sweep['segments'], sweep['bots']
+    hours, open_count, open_pnl = seg['Hours'], seg['Open'], seg['PnL']
+    avg_pnl = np.divide(open_pnl, open_count, out=np.zeros_like(open_pnl), where=open_count > 0)
+    rows = []
+
+    for i in range(len(bots)):
+        for j in range(i + 1, len(bots)):
+            both = (open_count[:, i] > 0) & (open_count[:, j] > 0) & (hours > 0)
+            overlap_hours = hours[both].sum()
+            both_losing = hours[both & (open_pnl[:, i] < 0) & (open_pnl[:, j] < 0)].sum()
+            rows.append({
+                'Pair': f"{bots[i]} / {bots[j]}",
+                'Overlap_Hours': overlap_hours,
+                'Segments': int(both.sum()),
+                'PnL_Corr': weighted_corr(avg_pnl[both, i], avg_pnl[both, j], hours[both]),
+                'Both_Losing_Pct': (both_losing / overlap_hours * 100) if overlap_hours > 0 else 0,
+            })
+
+    return pd.DataFrame(rows)
+
+
+def analyze_exposure(intervals):
+    """
+    Run the sweep and collect the headline exposure metrics.
+
+    Returns:
+        Dictionary with the sweep output, peak stats and pair table
+    """
+    sweep = sweep_exposure(intervals)
+    timeline = sweep['timeline']
+    results = {'sweep': sweep, 'timeline': timeline, 'pairs': pair_overlap_stats(sweep)}
+
+    if len(timeline) == 0:
+        return results
+
+    peak = timeline['Open_Positions'].idxmax()
+    peak_notional = timeline['Notional'].idxmax()
+    seg = sweep['segments']
+    total_hours = seg['Hours'].sum()
+
+    results.update({
+        'peak_positions': int(timeline.loc[peak, 'Open_Positions']),
+        'peak_positions_time': timeline.loc[peak, 'Time'],
+        'peak_notional': float(timeline.loc[peak_notional, 'Notional']),
+        'peak_notional_time': timeline.loc[peak_notional, 'Time'],
+        'avg_open_positions': (seg['Open'].sum(axis=1) * seg['Hours']).sum() / total_hours if total_hours > 0 else 0,
+        'per_bot_peak': {bot: int(timeline[f'Open_{bot}'].max()) for bot in sweep['bots']},
+    })
+    return results
+
+
+def print_exposure_report(results):
+    """Print the exposure report."""
+    print("=" * 90)
+    print("CONCURRENT EXPOSURE ANALYSIS")
+    print("=" * 90)
+
+    if 'peak_positions' not in results:
+        print("No valid position intervals found.")
+        return
+
+    sweep = results['sweep']
+    print(f"Intervals skipped (missing/invalid times): {sweep['dropped']}")
+    print(f"\n📊 Concurrency:")
+    print(f"   Peak Open Positions: {results['peak_positions']} at {results['peak_positions_time']}")
+    print(f"   Peak Notional:       {results['peak_notional']:.2f} USDT at {results['peak_notional_time']}")
+    print(f"   Avg Open Positions:  {results['avg_open_positions']:.2f} (time-weighted)")
+
+    print(f"\n📍 Peak per Bot:")
+    for bot, peak in results['per_bot_peak'].items():
+        print(f"   {bot:12s} → {peak} simultaneous positions")
+
+    print(f"\n🔗 Overlap Between Bots:")
+    for _, p in results['pairs'].iterrows():
+        corr = f"{p['PnL_Corr']:+.2f}" if pd.notna(p['PnL_Corr']) else "  n/a"
+        print(f"   {p['Pair']:24s} | Overlap: {p['Overlap_Hours']:7.1f}h | "
+              f"PnL corr: {corr} | Both losing: {p['Both_Losing_Pct']:5.1f}% of overlap")
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    # Optional: Bitget position-history export instead of the Phase 3/4 journals
+    if len(sys.argv) > 1:
+        df = analyze_trading_performance(Path(sys.argv[1]))['classified_df']
+        intervals = build_intervals_from_export(df)
+    else:
+        intervals = build_intervals_from_journal(load_journals())
+
+    print_exposure_report(analyze_exposure(intervals))
@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 
+from journal_loader import load_journal
+from journal_integrity import check_journal, print_integrity_report
+
 def parse_decimal(val):
     if isinstance(val, str):
         return float(val.replace(',', '.'))
@@ -103,15 +106,9 @@ def analyze():
     print(f"Conclusion: Closing at BE saved {sl_if_waited} full losses but missed {tp_if_waited} full wins.")
     print("-"*60)
     
-    # 6. NEGATIVE BE AUDIT
-    print("\nAUDIT: NEGATIVE BREAK-EVENS (To Correct)")
-    neg_be = df[(df['Exit_Raison'] == 'BE') & (df['PnL_Net'] < 0)]
-    if len(neg_be) > 0:
-        for idx, row in neg_be.iterrows():
-            print(f"Row {idx+2}: {row['Symbol']} ({row['Bot']}) | PnL: {row['PnL_Net']}")
-    else:
-        print("No negative BE trades found! (Everything >= 0)")
-    print("="*60)
+    # 6. INTEGRITY AUDIT (negative BE, TP/SL vs PnL, missing dates...)
+    report, skipped = check_journal(load_journal(file_path, phase='Phase 2', dropna=False))
+    print_integrity_report('Phase 2', report, skipped)
 
 if __name__ == "__main__":
     analyze()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Market Regime Analyzer
+Attaches the market regime in force at each trade's entry (MQI state and
+BTC market-bias label, as persisted by mqi.js in regime_timeline.csv) and
+breaks performance down by regime x bot x direction.
+
+Features:
+- MQI states re-derived from the persisted score with the mqi.js rules
+  (dead zones, then a replay of the shouldSendMQI state machine), so
+  alternative dead-zone settings can be evaluated without collecting new
+  data. MQI_State is the last *alerted* state, as on Telegram; the replay
+  starts from the first scan of the timeline (mqi.js restarts are not
+  recorded)
+- Sorted as-of join: each trade gets the last regime scan before its entry
+- One grouped pass per setting for regime x bot x direction metrics
+- Bias alignment (trade WITH / AGAINST the BTC bias, as in
+  getBiasScoreAdjustment)
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from journal_loader import BASE_DIR, VALID_REASONS, WIN_REASONS, load_journals
+
+REGIME_TIMELINE = BASE_DIR / "regime_timeline.csv"
+
+# mqi.js writes UTC timestamps; the journals are in Taiwan local time
+JOURNAL_TIMEZONE = 'Asia/Taipei'
+
+# mqi.js dead zones and alert settings (shouldSendMQI)
+DEADZONES = {
+    'neutral': (45, 55),
+    'strong': (58, 72),
+}
+REQUIRED_CONFIRMATIONS = 2
+MIN_SCORE_DELTA_FOR_ALERT = 7
+MIN_SEND_INTERVAL = pd.Timedelta(minutes=12)
+
+# A regime scan older than this at entry time is considered missing
+# (mqi.js scans every 5 minutes)
+MAX_REGIME_AGE = pd.Timedelta(minutes=30)
+
+UNKNOWN = 'UNKNOWN'
+
+# Alternative settings evaluated by sweep_deadzones()
+DEADZONE_SWEEP = {
+    'mqi.js (45-55 / 58-72)': DEADZONES,
+    'narrow (48-52 / 60-70)': {'neutral': (48, 52), 'strong': (60, 70)},
+    'wide (42-58 / 56-75)': {'neutral': (42, 58), 'strong': (56, 75)},
+    'none': {'neutral': (np.inf, -np.inf), 'strong': (np.inf, -np.inf)},
+}
+
+
+def load_regime_timeline(csv_file=REGIME_TIMELINE):
+    """
+    Load the regime timeline written by mqi.js.
+
+    Columns: time;mqi_score;mqi_state;bias_label;btc_trend
+
+    Returns:
+        DataFrame sorted by time, converted to journal local time
+    """
+    df = pd.read_csv(csv_file, sep=';')
+    df['time'] = (pd.to_datetime(df['time'], utc=True, errors='coerce')
+                  .dt.tz_convert(JOURNAL_TIMEZONE).dt.tz_localize(None))
+    df['mqi_score'] = pd.to_numeric(df['mqi_score'], errors='coerce')
+    if 'bias_label' not in df.columns:
+        df['bias_label'] = UNKNOWN
+    df['bias_label'] = df['bias_label'].fillna(UNKNOWN).astype(str).str.strip()
+    return df.dropna(subset=['time', 'mqi_score']).sort_values('time', ignore_index=True)
+
+
+def classify_mqi(scores, deadzones=DEADZONES):
+    """
+    Vectorized port of classifyMQI() from mqi.js.
+
+    Args:
+        scores: Array of smoothed MQI scores
+        deadzones: {'neutral': (low, high), 'strong': (low, high)}
+
+    Returns:
+        Array of state labels
+    """
+    s = np.asarray(scores, dtype=float)
+    n_low, n_high = deadzones['neutral']
+    s_low, s_high = deadzones['strong']
+    conditions = [
+        (s >= n_low) & (s <= n_high),
+        (s >= s_low) & (s <= s_high),
+        s >= 80,
+        s >= 70,
+        s >= 60,
+        s >= 50,
+        s >= 40,
+    ]
+    choices = ['MARKET NEUTRAL', 'MARKET OK', 'MARKET PRIME', 'MARKET STRONG',
+               'MARKET OK', 'MARKET NEUTRAL', 'MARKET WEAK']
+    return np.select(conditions, choices, default='MARKET DANGER')
+
+
+def alert_states(scores, states, times, required=REQUIRED_CONFIRMATIONS,
+                 min_delta=MIN_SCORE_DELTA_FOR_ALERT, cooldown=MIN_SEND_INTERVAL):
+    """
+    Replay shouldSendMQI() from mqi.js over the scan timeline.
+
+    Scans whose score moved less than `min_delta` from the last alert while
+    staying in the alerted state are ignored (they don't reset the
+    candidate), so confirmations need not be consecutive scans. A state is
+    adopted once seen `required` times as candidate and at least `cooldown`
+    after the previous alert. The first scan is adopted immediately.
+
+    The loop is sequential by nature but only runs over the scans (a few
+    thousand), not over the trades.
+
+    Returns:
+        Array with the last alerted state after each scan
+    """
+    scores = np.asarray(scores, dtype=float)
+    states = np.asarray(states, dtype=object)
+    times = np.asarray(times, dtype='datetime64[ns]')
+    cooldown = np.timedelta64(cooldown)
+
+    alerted = np.empty(len(states), dtype=object)
+    last_state = last_score = last_sent = candidate = None
+    confirmations = 0
+
+    for i, (score, state, now) in enumerate(zip(scores, states, times)):
+        if last_state is None:
+            last_state, last_score, last_sent = state, score, now
+        elif abs(score - last_score) < min_delta and state == last_state:
+            pass
+        elif candidate != state:
+            candidate, confirmations = state, 1
+        else:
+            confirmations += 1
+            if confirmations >= required and now - last_sent >= cooldown:
+                last_state, last_score, last_sent = state, score, now
+                confirmations = 0
+        alerted[i] = last_state
+
+    return alerted
+
+
+def regime_index(entry_times, regime_times, max_age=MAX_REGIME_AGE):
+    """
+    As-of lookup: index of the last regime scan at or before each entry.
+
+    Equivalent to pd.merge_asof(direction='backward', tolerance=max_age),
+    but returns positions so the join can be reused across settings.
+
+    Returns:
+        int array, -1 where no scan is recent enough
+    """
+    entries = np.asarray(entry_times, dtype='datetime64[ns]')
+    scans = np.asarray(regime_times, dtype='datetime64[ns]')
+    idx = np.searchsorted(scans, entries, side='right') - 1
+
+    valid = (idx >= 0) & ~np.isnat(entries)
+    age = np.full(len(entries), np.timedelta64(0, 'ns'))
+    age[valid] = entries[valid] - scans[idx[valid]]
+    valid &= age <= np.timedelta64(max_age)
+    return np.where(valid, idx, -1)
+
+
+def bias_alignment(direction, bias):
+    """WITH / AGAINST / NEUTRAL, following getBiasScoreAdjustment()."""
+    with_bias = ((direction == 'LONG') & (bias == 'BULLISH')) | ((direction == 'SHORT') & (bias == 'BEARISH'))
+    against = ((direction == 'LONG') & (bias == 'BEARISH')) | ((direction == 'SHORT') & (bias == 'BULLISH'))
+    return np.select([with_bias, against], ['WITH', 'AGAINST'], default='NEUTRAL')
+
+
+def attach_regimes(trades, timeline, idx, deadzones=DEADZONES, confirmations=REQUIRED_CONFIRMATIONS):
+    """
+    Label each trade with the regime in force at entry.
+
+    Args:
+        trades: Journal DataFrame
+        timeline: Output of load_regime_timeline
+        idx: Output of regime_index for these trades and this timeline
+        deadzones / confirmations: MQI classification settings
+
+    Returns:
+        Copy of `trades` with MQI_State, Bias and Bias_Alignment columns
+    """
+    out = trades.copy()
+    if len(timeline) == 0:
+        out['MQI_State'] = out['Bias'] = out['Bias_Alignment'] = UNKNOWN
+        return out
+
+    states = alert_states(timeline['mqi_score'], classify_mqi(timeline['mqi_score'], deadzones),
+                          timeline['time'], confirmations)
+    has_regime = idx >= 0
+    safe_idx = np.where(has_regime, idx, 0)
+
+    out['MQI_State'] = np.where(has_regime, states[safe_idx], UNKNOWN)
+    out['Bias'] = np.where(has_regime, timeline['bias_label'].to_numpy()[safe_idx], UNKNOWN)
+    out['Bias_Alignment'] = np.where(has_regime, bias_alignment(out['Direction'], out['Bias']), UNKNOWN)
+    return out
+
+
+def prepare_trades(trades):
+    """
+    Slim, categorical copy of the journal for repeated grouping: only the
+    columns the metrics need, with win/valid flags computed once.
+    """
+    return pd.DataFrame({
+        'Bot': trades['Bot'].astype('category'),
+        'Direction': trades['Direction'].astype('category'),
+        'PnL_Net': trades['PnL_Net'].to_numpy(dtype=float),
+        'Win': trades['Exit_Raison'].isin(WIN_REASONS).to_numpy(),
+        'Valid': trades['Exit_Raison'].isin(VALID_REASONS).to_numpy(),
+    }, index=trades.index)
+
+
+def regime_metrics(df, keys=('MQI_State', 'Bias', 'Bot', 'Direction')):
+    """
+    Performance per regime x bot x direction in one grouped pass.
+
+    Returns:
+        DataFrame indexed by `keys` with Trades, PnL_Sum, PnL_Avg, Win_Rate
+    """
+    if 'Win' not in df.columns:
+        df = df.assign(
+            Win=df['Exit_Raison'].isin(WIN_REASONS),
+            Valid=df['Exit_Raison'].isin(VALID_REASONS),
+        )
+    grouped = df.groupby(list(keys), sort=True, observed=True).agg(
+        Trades=('PnL_Net', 'size'),
+        PnL_Sum=('PnL_Net', 'sum'),
+        PnL_Avg=('PnL_Net', 'mean'),
+        Wins=('Win', 'sum'),
+        Valid=('Valid', 'sum'),
+    )
+    grouped['Win_Rate'] = np.where(grouped['Valid'] > 0, grouped['Wins'] / grouped['Valid'].clip(lower=1) * 100, 0.0)
+    return grouped.drop(columns=['Wins', 'Valid'])
+
+
+def sweep_deadzones(trades, timeline, settings=None, confirmations=REQUIRED_CONFIRMATIONS):
+    """
+    Re-run the regime breakdown for several dead-zone settings.
+
+    The as-of join and the trade columns are prepared once; each setting
+    only re-classifies the timeline (a few thousand scans), gathers the
+    state per trade and regroups.
+
+    Returns:
+        Dictionary setting name -> regime_metrics by MQI_State x Bot
+    """
+    settings = settings or DEADZONE_SWEEP
+    idx = regime_index(trades['Entry_Time'], timeline['time'])
+    base = prepare_trades(trades)
+    has_regime = idx >= 0
+    safe_idx = np.where(has_regime, idx, 0)
+    results = {}
+
+    for name, deadzones in settings.items():
+        if len(timeline):
+            states = alert_states(timeline['mqi_score'], classify_mqi(timeline['mqi_score'], deadzones),
+                                  timeline['time'], confirmations)
+            labels, codes = np.unique(states, return_inverse=True)
+            labels = np.append(labels, UNKNOWN)
+            codes = np.where(has_regime, codes[safe_idx], len(labels) - 1)
+        else:
+            labels, codes = np.array([UNKNOWN]), np.zeros(len(base), dtype=int)
+        state = pd.Categorical.from_codes(codes, categories=labels)
+        results[name] = regime_metrics(base.assign(MQI_State=state), keys=('MQI_State', 'Bot'))
+
+    return results
+
+
+def print_regime_report(labeled, sweep):
+    """Print the regime breakdown and the dead-zone sweep."""
+    print("=" * 90)
+    print("PERFORMANCE BY MARKET REGIME AT ENTRY")
+    print("=" * 90)
+    matched = (labeled['MQI_State'] != UNKNOWN).sum()
+    print(f"Trades: {len(labeled)} | With regime at entry: {matched} "
+          f"(max scan age {MAX_REGIME_AGE})")
+
+    print(f"\n📊 MQI State x Bias x Bot x Direction:")
+    print(regime_metrics(labeled).round(4).to_string())
+
+    print(f"\n🎯 Bias Alignment:")
+    print(regime_metrics(labeled, keys=('Bias_Alignment', 'Bot')).round(4).to_string())
+
+    print("\n" + "=" * 90)
+    print("DEAD-ZONE SWEEP (MQI State x Bot)")
+    print("=" * 90)
+    for name, metrics in sweep.items():
+        print(f"\n{' ' + name + ' ':-^90}")
+        print(metrics.round(4).to_string())
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    timeline_file = Path(sys.argv[1]) if len(sys.argv) > 1 else REGIME_TIMELINE
+    if not timeline_file.exists():
+        print(f"❌ No regime timeline at {timeline_file}")
+        print("   mqi.js appends one line per scan (time;mqi_score;mqi_state;bias_label;btc_trend)")
+        sys.exit(1)
+
+    trades = load_journals()
+    timeline = load_regime_timeline(timeline_file)
+
+    idx = regime_index(trades['Entry_Time'], timeline['time'])
+    labeled = attach_regimes(trades, timeline, idx)
+
+    print_regime_report(labeled, sweep_deadzones(trades, timeline))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Per-Symbol Analyzer
+Breaks journal results down by symbol x bot x direction and exports a
+machine-readable blacklist / whitelist for filters.js.
+
+Features:
+- Categorical group-by with sparse output (only observed combinations)
+- Empirical-Bayes shrinkage of each symbol's average PnL and win rate
+  toward its bot/direction mean, so a symbol with 1-2 trades can't top
+  or bottom the rankings on luck alone
+- Top/bottom-N rankings on the shrunk expectancy (in bets per trade)
+- config/symbol_lists.json: {bot: {direction: [symbols]}} black/white lists,
+  selected on the symbol's shrunk *deviation* from its bot/direction mean,
+  so a weak bot/direction doesn't blacklist all of its symbols
+"""
+
+import sys
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+
+from journal_loader import BASE_DIR, VALID_REASONS, WIN_REASONS, get_bot_config, load_journals
+
+SYMBOL_LISTS_FILE = BASE_DIR / "config" / "symbol_lists.json"
+
+# Shrinkage strength (in trades) is estimated per bot/direction, within bounds
+MIN_PRIOR_TRADES = 2
+MAX_PRIOR_TRADES = 50
+
+# Export thresholds, on the shrunk deviation from the bot/direction mean
+# (Shrunk_Dev_R, in bets per trade). Shrinkage already discounts small
+# samples, so these are tighter than thresholds on raw averages would be.
+MIN_TRADES = 3
+BLACKLIST_DEV_R = -0.01
+WHITELIST_DEV_R = 0.01
+
+TOP_N = 10
+
+KEYS = ['Symbol', 'Bot', 'Direction']
+
+
+def base_symbol(symbol):
+    """Strip the legacy _UMCBL suffix (same as baseSymbol() in mqi.js)."""
+    return symbol.str.replace('_UMCBL', '', regex=False).str.upper()
+
+
+def symbol_stats(df):
+    """
+    Aggregate trades per symbol x bot x direction in one categorical pass.
+
+    Returns:
+        DataFrame with one row per observed combination: Trades, PnL_Sum,
+        PnL_Avg, PnL_Var, Wins, Valid
+    """
+    trades = pd.DataFrame({
+        'Symbol': base_symbol(df['Symbol'].astype(str)).astype('category'),
+        'Bot': df['Bot'].astype('category'),
+        'Direction': df['Direction'].astype('category'),
+        'PnL_Net': df['PnL_Net'].to_numpy(dtype=float),
+        'Win': df['Exit_Raison'].isin(WIN_REASONS).to_numpy(),
+        'Valid': df['Exit_Raison'].isin(VALID_REASONS).to_numpy(),
+    })
+    trades['PnL_Sq'] = trades['PnL_Net'] ** 2
+
+    stats = trades.groupby(KEYS, observed=True, sort=False).agg(
+        Trades=('PnL_Net', 'size'),
+        PnL_Sum=('PnL_Net', 'sum'),
+        PnL_Sq=('PnL_Sq', 'sum'),
+        Wins=('Win', 'sum'),
+        Valid=('Valid', 'sum'),
+    ).reset_index()
+
+    stats['PnL_Avg'] = stats['PnL_Sum'] / stats['Trades']
+    stats['PnL_Var'] = (stats['PnL_Sq'] / stats['Trades'] - stats['PnL_Avg'] ** 2).clip(lower=0)
+    return stats.drop(columns='PnL_Sq')
+
+
+def shrink(stats):
+    """
+    Shrink each symbol's average PnL and win rate toward its bot/direction
+    mean.
+
+    The prior weight k (in trades) is sigma^2 / tau^2 per bot/direction:
+    within-symbol trade variance over between-symbol variance of the true
+    means. Shrunk mean = (n * symbol mean + k * group mean) / (n + k).
+
+    Returns:
+        Copy of `stats` with Group_Avg, Prior_Trades, Shrunk_Avg, Shrunk_WR,
+        Shrunk_R (shrunk expectancy in bets) and Shrunk_Dev_R (shrunk
+        deviation from the group mean, in bets)
+    """
+    out = stats.copy()
+    group = out.groupby(['Bot', 'Direction'], observed=True, sort=False)
+
+    n = out['Trades']
+    by = [out['Bot'], out['Direction']]
+    total = group['Trades'].transform('sum')
+    n_symbols = group['Trades'].transform('size')
+    group_avg = group['PnL_Sum'].transform('sum') / total
+
+    # Method of moments (one-way random effects, unbalanced):
+    # pooled within-symbol variance, then between-symbol variance of means
+    within_ss = (out['PnL_Var'] * n).groupby(by, observed=True).transform('sum')
+    sigma2 = within_ss / (total - n_symbols).clip(lower=1)
+    between_ss = (n * (out['PnL_Avg'] - group_avg) ** 2).groupby(by, observed=True).transform('sum')
+    n_eff = total - (n ** 2).groupby(by, observed=True).transform('sum') / total
+    tau2 = (between_ss - (n_symbols - 1) * sigma2) / n_eff.where(n_eff > 0)
+
+    prior = np.where(tau2 > 0, sigma2 / tau2.where(tau2 > 0, 1), MAX_PRIOR_TRADES)
+    prior = np.clip(prior, MIN_PRIOR_TRADES, MAX_PRIOR_TRADES)
+    out['Group_Avg'] = group_avg
+    out['Prior_Trades'] = prior
+    out['Shrunk_Avg'] = (out['PnL_Sum'] + prior * group_avg) / (n + prior)
+
+    group_wr = group['Wins'].transform('sum') / group['Valid'].transform('sum').clip(lower=1)
+    out['Shrunk_WR'] = (out['Wins'] + prior * group_wr) / (out['Valid'] + prior) * 100
+
+    bets = out['Bot'].astype(str).map(lambda b: (get_bot_config(b) or {}).get('bet', np.nan))
+    out['Shrunk_R'] = out['Shrunk_Avg'] / bets.astype(float)
+    out['Shrunk_Dev_R'] = (out['Shrunk_Avg'] - group_avg) / bets.astype(float)
+    return out
+
+
+def rank_symbols(stats, n=TOP_N, min_trades=MIN_TRADES):
+    """
+    Top and bottom N symbol x bot x direction rows by shrunk expectancy.
+
+    Returns:
+        (top, bottom) DataFrames
+    """
+    eligible = stats[(stats['Trades'] >= min_trades) & stats['Shrunk_R'].notna()]
+    return eligible.nlargest(n, 'Shrunk_R'), eligible.nsmallest(n, 'Shrunk_R')
+
+
+def build_symbol_lists(stats, min_trades=MIN_TRADES, blacklist_dev_r=BLACKLIST_DEV_R,
+                       whitelist_dev_r=WHITELIST_DEV_R):
+    """
+    Build the black/white lists loaded by filters.js.
+
+    A symbol is listed when its shrunk result is clearly below / above the
+    rest of its bot/direction, not because the bot/direction as a whole is
+    losing or winning.
+
+    Returns:
+        Dictionary ready to be dumped as JSON
+    """
+    eligible = stats[(stats['Trades'] >= min_trades) & stats['Shrunk_Dev_R'].notna()]
+
+    def to_lists(rows):
+        lists = {}
+        for (bot, direction), symbols in rows.groupby(['Bot', 'Direction'], observed=True)['Symbol']:
+            lists.setdefault(str(bot), {})[str(direction)] = sorted(symbols.astype(str))
+        return lists
+
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'criteria': {
+            'min_trades': min_trades,
+            'blacklist_dev_r': blacklist_dev_r,
+            'whitelist_dev_r': whitelist_dev_r,
+        },
+        'blacklist': to_lists(eligible[eligible['Shrunk_Dev_R'] <= blacklist_dev_r]),
+        'whitelist': to_lists(eligible[eligible['Shrunk_Dev_R'] >= whitelist_dev_r]),
+    }
+
+
+def save_symbol_lists(lists, output_file=SYMBOL_LISTS_FILE):
+    """Write the symbol lists as JSON."""
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(lists, f, indent=2)
+    print(f"\n✅ Symbol lists saved to: {output_file}")
+
+
+def print_symbol_report(stats, top, bottom, lists):
+    """Print rankings and list sizes."""
+    print("=" * 90)
+    print("PER-SYMBOL PERFORMANCE (shrunk toward bot/direction mean)")
+    print("=" * 90)
+    print(f"Symbols: {stats['Symbol'].nunique()} | Symbol x Bot x Direction rows: {len(stats)} | "
+          f"Trades: {int(stats['Trades'].sum())}")
+
+    columns = ['Symbol', 'Bot', 'Direction', 'Trades', 'PnL_Sum', 'PnL_Avg', 'Shrunk_Avg', 'Shrunk_WR', 'Shrunk_R',
+               'Shrunk_Dev_R']
+    for title, rows in [(f"🥇 TOP {len(top)}", top), (f"❌ BOTTOM {len(bottom)}", bottom)]:
+        print(f"\n{title} (min {MIN_TRADES} trades):")
+        print(rows[columns].round(4).to_string(index=False) if len(rows) else "   No symbol with enough trades")
+
+    print(f"\n📋 Exported lists (shrunk deviation from bot/direction mean "
+          f"<= {BLACKLIST_DEV_R} / >= {WHITELIST_DEV_R} bets):")
+    for name in ['blacklist', 'whitelist']:
+        for bot, by_dir in lists[name].items():
+            for direction, symbols in by_dir.items():
+                print(f"   {name:9s} {bot:10s} {direction:5s} → {', '.join(symbols)}")
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    output_file = Path(sys.argv[1]) if len(sys.argv) > 1 else SYMBOL_LISTS_FILE
+
+    stats = shrink(symbol_stats(load_journals()))
+    top, bottom = rank_symbols(stats)
+    lists = build_symbol_lists(stats)
+
+    print_symbol_report(stats, top, bottom, lists)
+    save_symbol_lists(lists, output_file)
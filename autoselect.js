@@ -293,7 +293,7 @@ async function scanOnce() {
     if (isRecentlySignaled(rec.symbol, 45 * 60_000)) continue;
 
     // 🎯 Advanced Filters (Orderbook/Funding/Trend)
-    const adv = await applyAdvancedFilters(rec.symbol, fusion.direction, score);
+    const adv = await applyAdvancedFilters(rec.symbol, fusion.direction, score, null, "MAJORS");
     if (adv.isBlocked) {
       console.log(`[MAJORS BLOCKED] ${rec.symbol} — ${adv.reason}`);
       continue;
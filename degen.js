@@ -204,7 +204,7 @@ async function analyzeCandidate(rec, marketContext) {
   if (score < 80) return null; // Phase 5: Raised from 75 to 80
 
   // 🎯 Advanced Filters (Orderbook/Funding)
-  const adv = await applyAdvancedFilters(rec.symbol, dir, score);
+  const adv = await applyAdvancedFilters(rec.symbol, dir, score, null, "DEGEN");
   if (adv.isBlocked) {
     console.log(`[DEGEN BLOCKED] ${rec.symbol} — ${adv.reason}`);
     return null;
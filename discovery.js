@@ -218,7 +218,7 @@ async function analyzeDiscovery(rec, marketContext) {
   if (score < 85) return null; // Phase 5: Raised from 80 to eliminate toxic 80-85 bucket
 
   // 🎯 Advanced Filters (Orderbook/Funding)
-  const adv = await applyAdvancedFilters(rec.symbol, dir, score);
+  const adv = await applyAdvancedFilters(rec.symbol, dir, score, null, "DISCOVERY");
   if (adv.isBlocked) {
     console.log(`[DISCOVERY BLOCKED] ${rec.symbol} — ${adv.reason}`);
     return null;
@@ -2,7 +2,44 @@
  * filters.js - Filtres avancés pour la Phase 3
  * Fournit des indicateurs sur l'Orderbook, le Funding et l'Open Interest.
  */
+import fs from "fs";
 import fetch from "node-fetch";
+import { loadJson } from "./config/loadJson.js";
+
+// Listes noires/blanches générées par analyze_symbols.py (optionnel)
+// Rechargées dès que le fichier change (pas besoin de redémarrer index.js)
+const SYMBOL_LISTS_FILE = "./config/symbol_lists.json";
+
+// Bonus de score pour un symbole whitelisté (même ordre que le bonus orderbook)
+const WHITELIST_SCORE_BONUS = 5;
+
+let symbolLists = null;
+let symbolListsMtime = null;
+
+function getSymbolLists() {
+    try {
+        if (!fs.existsSync(SYMBOL_LISTS_FILE)) {
+            symbolLists = null;
+            symbolListsMtime = null;
+            return null;
+        }
+        const mtime = fs.statSync(SYMBOL_LISTS_FILE).mtimeMs;
+        if (mtime !== symbolListsMtime) {
+            symbolListsMtime = mtime;
+            symbolLists = loadJson(SYMBOL_LISTS_FILE);
+        }
+    } catch (e) {
+        // Fichier en cours d'écriture ou invalide : on garde les listes
+        // précédentes (une seule erreur par modification du fichier)
+        console.error("[FILTERS] Error loading symbol lists", e.message);
+    }
+    return symbolLists;
+}
+
+function isSymbolListed(listName, symbol, direction, bot) {
+    const list = getSymbolLists()?.[listName]?.[bot]?.[direction];
+    return Array.isArray(list) && list.includes(symbol.replace("_UMCBL", ""));
+}
 
 async function safeGetJson(url) {
     try {
@@ -76,15 +113,43 @@ export async function getOIImpulse(symbol) {
     }
 }
 
+/**
+ * Vérifie si un symbole est blacklisté pour un bot et une direction
+ * @param {string} symbol
+ * @param {string} direction - LONG ou SHORT
+ * @param {string} bot - DEGEN, DISCOVERY, SWING ou MAJORS
+ * @returns {boolean}
+ */
+export function isSymbolBlacklisted(symbol, direction, bot) {
+    return isSymbolListed("blacklist", symbol, direction, bot);
+}
+
+/**
+ * Vérifie si un symbole est whitelisté pour un bot et une direction
+ * @param {string} symbol
+ * @param {string} direction - LONG ou SHORT
+ * @param {string} bot - DEGEN, DISCOVERY, SWING ou MAJORS
+ * @returns {boolean}
+ */
+export function isSymbolWhitelisted(symbol, direction, bot) {
+    return isSymbolListed("whitelist", symbol, direction, bot);
+}
+
 /**
  * Applique les filtres de sécurité pour un signal donné
  * @param {string} symbol
  * @param {string} direction
  * @param {number} currentScore
  * @param {object} candles - Bougies pour calcul de tendance
+ * @param {string} bot - Nom du bot (pour la blacklist par symbole)
  * @returns {Promise<{isBlocked: boolean, reason: string, scoreAdj: number}>}
  */
-export async function applyAdvancedFilters(symbol, direction, currentScore, candles = null) {
+export async function applyAdvancedFilters(symbol, direction, currentScore, candles = null, bot = null) {
+    // 0. Blacklist par symbole (avant tout appel API)
+    if (bot && isSymbolBlacklisted(symbol, direction, bot)) {
+        return { isBlocked: true, reason: `Blacklisted (${bot} ${direction})`, scoreAdj: 0 };
+    }
+
     const imbalance = await getOrderbookImbalance(symbol);
     const funding = await getFundingRate(symbol);
 
@@ -122,6 +187,8 @@ export async function applyAdvancedFilters(symbol, direction, currentScore, cand
     // 4. Scoring Bonus
     if (direction === "LONG" && imbalance > 1.2) scoreAdj += 5;
     if (direction === "SHORT" && imbalance < 0.8) scoreAdj += 5;
+    // Whitelist : bonus uniquement, les filtres de sécurité restent actifs
+    if (bot && isSymbolWhitelisted(symbol, direction, bot)) scoreAdj += WHITELIST_SCORE_BONUS;
 
     return { isBlocked, reason, scoreAdj };
 }
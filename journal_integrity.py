@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Journal Integrity Checker
+Declarative rule engine that audits a trade journal before it is analyzed.
+
+Every rule is a vectorized boolean mask over the whole journal (no
+iterrows), working on what load_journal already parsed (categorical text
+columns, numeric `#`). On a synthetic 1M-row journal the rules take
+~0.1-0.3 s (the upper end when most rows are duplicates) on top of
+~1.2-2 s of load_journal, mostly read_csv; the real journals are loaded
+and checked in milliseconds.
+
+Features:
+- Exit / PnL consistency (TP with negative PnL, SL with positive PnL,
+  negative break-evens)
+- `Durée de trade` vs entry/exit timestamps
+- Missing scores, non-numeric `#` rows (skipped by recalc_csv.js),
+  duplicate trades, exit before entry, unknown direction / exit reason
+- Violation report with CSV row numbers and rule IDs
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from journal_loader import JOURNALS, VALID_REASONS, WIN_REASONS, load_journal
+
+LOSS_REASONS = ['SL', 'SLDe']
+BE_REASONS = ['BE']
+
+# Allowed gap between `Durée de trade` and exit - entry, in minutes
+DURATION_TOLERANCE_MIN = 1
+
+DUPLICATE_KEYS = ['Bot', 'Symbol', 'Direction', 'Entry_Time', 'PnL_Net']
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+def duration_column(df):
+    """Name of the `Durée de trade ` column (exported with a trailing space)."""
+    return next((c for c in df.columns if c.strip() == 'Durée de trade'), None)
+
+
+def parse_duration_minutes(series):
+    """
+    Parse `4h 29m` / `1h` / `45m` durations into minutes (NaN if invalid).
+
+    Durations repeat a lot, so only the distinct strings go through the regex.
+    """
+    codes, uniques = pd.factorize(series)
+    parts = pd.Series(uniques, dtype=object).astype(str).str.extract(
+        r'^\s*(?:(\d+)\s*h)?\s*(?:(\d+)\s*m(?:in)?)?\s*$')
+    hours = pd.to_numeric(parts[0], errors='coerce')
+    minutes = pd.to_numeric(parts[1], errors='coerce')
+    total = (hours.fillna(0) * 60 + minutes.fillna(0)).where(hours.notna() | minutes.notna())
+
+    parsed = np.append(total.to_numpy(dtype=float), np.nan)
+    return pd.Series(parsed[np.where(codes >= 0, codes, len(uniques))], index=series.index)
+
+
+def _duration_mismatch(df):
+    col = duration_column(df)
+    declared = parse_duration_minutes(df[col])
+    actual = (df['Exit_Time'] - df['Entry_Time']).dt.total_seconds() / 60
+    return (declared - actual).abs() > DURATION_TOLERANCE_MIN
+
+
+def _missing_dates(df):
+    missing = df['Entry_Time'].isna()
+    if 'Exit_Time' in df.columns:
+        missing |= df['Exit_Time'].isna()
+    return missing
+
+
+def _duplicate_trade(df):
+    # Pre-filter on a single hash of (entry time, PnL): collisions only add
+    # candidates. Candidates are then compared on entry time, PnL and one
+    # 64-bit hash of the text keys (hashed once, over their distinct values),
+    # so duplicated() never runs on string columns.
+    entry = df['Entry_Time'].to_numpy('datetime64[ns]')
+    t = entry.view('int64')
+    p = df['PnL_Net'].to_numpy(dtype=float)
+    numeric_key = pd.util.hash_array(t) ^ pd.util.hash_array(p)
+    candidates = pd.Series(numeric_key).duplicated(keep=False).to_numpy() & ~np.isnat(entry)
+
+    dup = np.zeros(len(df), dtype=bool)
+    if candidates.any():
+        text_keys = [c for c in DUPLICATE_KEYS if c not in ('Entry_Time', 'PnL_Net')]
+        keys = pd.DataFrame({
+            'h': pd.util.hash_pandas_object(df.loc[candidates, text_keys], index=False).to_numpy(),
+            't': t[candidates],
+            'p': p[candidates],
+        })
+        dup[candidates] = keys.duplicated(keep='first').to_numpy()
+    return pd.Series(dup, index=df.index)
+
+
+# Each rule: columns it needs (skipped when absent) and a vectorized check
+# returning a boolean mask of violating rows.
+RULES = [
+    {
+        'id': 'R01', 'severity': ERROR, 'columns': ['Exit_Raison', 'PnL_Net'],
+        'description': 'TP exit with negative PnL',
+        'check': lambda d: d['Exit_Raison'].isin(WIN_REASONS) & (d['PnL_Net'] < 0),
+    },
+    {
+        'id': 'R02', 'severity': ERROR, 'columns': ['Exit_Raison', 'PnL_Net'],
+        'description': 'SL exit with positive PnL',
+        'check': lambda d: d['Exit_Raison'].isin(LOSS_REASONS) & (d['PnL_Net'] > 0),
+    },
+    {
+        'id': 'R03', 'severity': ERROR, 'columns': ['Exit_Raison', 'PnL_Net'],
+        'description': 'Break-even with negative PnL',
+        'check': lambda d: d['Exit_Raison'].isin(BE_REASONS) & (d['PnL_Net'] < 0),
+    },
+    {
+        'id': 'R04', 'severity': WARNING, 'columns': ['Entry_Time', 'Exit_Time'],
+        'description': f'Durée de trade differs from exit - entry by > {DURATION_TOLERANCE_MIN} min',
+        'check': _duration_mismatch,
+        'requires': duration_column,
+    },
+    {
+        'id': 'R05', 'severity': WARNING, 'columns': ['Score'],
+        'description': 'Missing or non-numeric score',
+        'check': lambda d: d['Score'].isna(),
+    },
+    {
+        'id': 'R06', 'severity': ERROR, 'columns': ['Trade_No'],
+        'description': 'Non-numeric # (row skipped by recalc_csv.js)',
+        'check': lambda d: d['Trade_No'].isna(),
+    },
+    {
+        'id': 'R07', 'severity': ERROR, 'columns': DUPLICATE_KEYS,
+        'description': 'Duplicate trade (same bot, symbol, direction, entry and PnL)',
+        'check': _duplicate_trade,
+    },
+    {
+        'id': 'R08', 'severity': ERROR, 'columns': ['Entry_Time', 'Exit_Time'],
+        'description': 'Exit before entry',
+        'check': lambda d: d['Exit_Time'] < d['Entry_Time'],
+    },
+    {
+        'id': 'R09', 'severity': ERROR, 'columns': ['PnL_Net'],
+        'description': 'Missing or non-numeric PnL_Net',
+        'check': lambda d: d['PnL_Net'].isna(),
+    },
+    {
+        'id': 'R10', 'severity': ERROR, 'columns': ['Entry_Time'],
+        'description': 'Missing or unparseable entry/exit date',
+        'check': _missing_dates,
+    },
+    {
+        'id': 'R11', 'severity': ERROR, 'columns': ['Direction'],
+        'description': 'Direction is not LONG/SHORT',
+        'check': lambda d: ~d['Direction'].isin(['LONG', 'SHORT']),
+    },
+    {
+        'id': 'R12', 'severity': WARNING, 'columns': ['Exit_Raison'],
+        'description': 'Unknown exit reason',
+        'check': lambda d: ~d['Exit_Raison'].isin(VALID_REASONS + WIN_REASONS),
+    },
+]
+
+
+def trade_rows(df):
+    """Mask of real trades (the Numbers exports end with empty template rows)."""
+    filled = df['PnL_Net'].notna().to_numpy().copy()
+    # Bot / Symbol may be plain strings (slow isna); only look at them where PnL is missing
+    empty = ~filled
+    if empty.any():
+        filled[empty] = (df['Bot'][empty].notna() | df['Symbol'][empty].notna()).to_numpy()
+    return filled
+
+
+def check_journal(df, rules=None):
+    """
+    Evaluate every applicable rule on a journal loaded with
+    load_journal(..., dropna=False).
+
+    Args:
+        df: Normalized journal DataFrame
+        rules: Rules to run (defaults to RULES)
+
+    Returns:
+        (report, skipped) where report has one row per violation (Row, Rule,
+        Severity, Description, Bot, Symbol, PnL_Net), ordered by rule then
+        row, and skipped lists the rule IDs whose columns are missing from
+        this journal
+    """
+    rules = rules or RULES
+    filled = trade_rows(df)
+
+    applicable, skipped = [], []
+    for rule in rules:
+        ok = all(c in df.columns for c in rule['columns'])
+        ok = ok and (rule.get('requires') is None or rule['requires'](df) is not None)
+        (applicable if ok else skipped).append(rule)
+
+    if not applicable or not filled.any():
+        return pd.DataFrame(columns=['Row', 'Rule', 'Severity', 'Description', 'Bot', 'Symbol', 'PnL_Net']), [r['id'] for r in skipped]
+
+    # Rules run on the full frame (no copy); template rows are masked out.
+    # Each rule only keeps the positions of its violations.
+    hits = [np.flatnonzero(rule['check'](df).fillna(False).to_numpy(dtype=bool) & filled)
+            for rule in applicable]
+    row_pos = np.concatenate(hits)
+    rule_pos = np.repeat(np.arange(len(applicable)), [len(h) for h in hits])
+
+    # Rule metadata as categoricals over rule codes: no per-violation strings
+    severity_levels = [ERROR, WARNING]
+    severity_codes = np.array([severity_levels.index(r['severity']) for r in applicable])
+
+    report = pd.DataFrame({
+        'Row': df['Row'].to_numpy()[row_pos],
+        'Rule': pd.Categorical.from_codes(rule_pos, [r['id'] for r in applicable]),
+        'Severity': pd.Categorical.from_codes(severity_codes[rule_pos], severity_levels),
+        'Description': pd.Categorical.from_codes(rule_pos, [r['description'] for r in applicable]),
+        'Bot': df['Bot'].array.take(row_pos),
+        'Symbol': df['Symbol'].array.take(row_pos),
+        'PnL_Net': df['PnL_Net'].to_numpy()[row_pos],
+    })
+    return report, [r['id'] for r in skipped]
+
+
+def is_clean(report, severity=ERROR):
+    """True when the report has no violation of the given severity."""
+    return not (report['Severity'] == severity).any()
+
+
+def print_integrity_report(name, report, skipped, load_time=None, check_time=None, max_rows=30):
+    """Print the per-rule summary and the first violations."""
+    print("=" * 90)
+    print(f"JOURNAL INTEGRITY: {name}")
+    print("=" * 90)
+    if load_time is not None and check_time is not None:
+        print(f"Loaded in {load_time * 1000:.1f} ms | Checked in {check_time * 1000:.1f} ms | "
+              f"Total {(load_time + check_time) * 1000:.1f} ms")
+    if skipped:
+        print(f"Skipped (columns missing): {', '.join(skipped)}")
+
+    if len(report) == 0:
+        print("✅ No violation found!")
+        print("=" * 90)
+        return
+
+    summary = report.groupby(['Rule', 'Severity', 'Description'], sort=True, observed=True).size()
+    print(f"\n📋 Violations by rule:")
+    for (rule, severity, description), count in summary.items():
+        icon = "❌" if severity == ERROR else "⚠️ "
+        print(f"   {icon} {rule} {description}: {count}")
+
+    print(f"\n📍 Rows to correct:")
+    for _, v in report.sort_values(['Row', 'Rule']).head(max_rows).iterrows():
+        print(f"   Row {v['Row']}: {v['Rule']} | {v['Symbol']} ({v['Bot']}) | PnL: {v['PnL_Net']}")
+    if len(report) > max_rows:
+        print(f"   ... and {len(report) - max_rows} more")
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    journals = {Path(p).stem: Path(p) for p in sys.argv[1:]} or JOURNALS
+
+    all_clean = True
+    for name, path in journals.items():
+        start = time.perf_counter()
+        df = load_journal(path, phase=name, dropna=False)
+        loaded = time.perf_counter()
+        report, skipped = check_journal(df)
+        checked = time.perf_counter()
+        print_integrity_report(name, report, skipped, loaded - start, checked - loaded)
+        all_clean &= is_clean(report)
+
+    # Non-zero exit so the check can gate the analysis scripts
+    sys.exit(0 if all_clean else 1)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Journal Loader
+Shared parsing for the Phase 3/4 trade journals (`Suivi_Trades_Phase*`).
+
+The journals are Numbers exports: ';' separated, comma decimals, French
+headers and dates in either `13/01/2026` or `7/2/26` form. Every column is
+parsed with vectorized pandas string ops, on its distinct values only
+(journals repeat the same bots, dates, hours and amounts a lot), so loading
+stays cheap even on very large journals.
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from analyze_trading_bots import BOT_CONFIGS
+
+BASE_DIR = Path(__file__).resolve().parent
+
+PHASE3_JOURNAL = BASE_DIR / "Suivi_Trades_Phase3" / "Suivi_Trades_Phase3.csv"
+PHASE4_JOURNAL = BASE_DIR / "Suivi_Trades_Phase4" / "Suivi_Trades_Phase4" / "Trades-Sheet 1-Suivi_Trades_Phase4.csv"
+
+JOURNALS = {
+    'Phase 3': PHASE3_JOURNAL,
+    'Phase 4': PHASE4_JOURNAL,
+}
+
+# Journal bot names that map to a BOT_CONFIGS entry under another name
+BOT_ALIASES = {
+    'MAJORS': 'TOP30',
+    'TOP 30': 'TOP30',
+}
+
+DATE_FORMATS = ['%d/%m/%Y', '%d/%m/%y']
+HOUR_FORMAT = '%H:%M'
+
+# Exit classification shared by compare_phases.py / compare_scoring.py
+WIN_REASONS = ['TP', 'TP1 & TP2 Touchés', 'TP1 Touché', 'TPDe', 'TP Unique touché']
+VALID_REASONS = ['TP', 'SL', 'BE', 'TPDe', 'SLDe', 'TP Unique touché', 'Time Limit']
+
+
+def get_bot_config(bot_name):
+    """Return the BOT_CONFIGS entry for a journal/export bot name (or None)."""
+    return BOT_CONFIGS.get(BOT_ALIASES.get(bot_name, bot_name))
+
+
+def map_distinct(series, func):
+    """
+    Apply a vectorized `func` to the distinct values of `series` only and
+    map the result back onto every row (missing values stay missing).
+
+    Returns:
+        Series aligned on `series.index`
+    """
+    codes, uniques = pd.factorize(series)
+    mapped = np.asarray(func(pd.Series(uniques, dtype=object)))
+    return pd.Series(pd.api.extensions.take(mapped, codes, allow_fill=True), index=series.index)
+
+
+def parse_decimal_series(series):
+    """Parse a column of comma-decimal strings into floats (NaN if invalid)."""
+    def parse(unique):
+        return pd.to_numeric(unique.astype(str).str.strip().str.replace(',', '.', regex=False),
+                             errors='coerce')
+    return map_distinct(series, parse).astype(float)
+
+
+def parse_text_series(series):
+    """
+    Strip surrounding spaces from a text column and return it as a
+    categorical (bots, symbols, directions and exit reasons only take a
+    few distinct values, so later isin / groupby / hashing work on codes).
+    """
+    codes, uniques = pd.factorize(series)
+    stripped_codes, categories = pd.factorize(pd.Series(uniques, dtype=object).str.strip())
+    codes = np.where(codes >= 0, np.append(stripped_codes, -1)[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=series.index)
+
+
+def parse_trade_number(series):
+    """
+    Parse the `#` column like recalc_csv.js (`parseInt`): the leading
+    integer, NaN when there is none. read_csv already parses fully numeric
+    columns, so the string path only runs on journals with odd rows.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    parsed = pd.to_numeric(series, errors='coerce')
+    failed = parsed.isna() & series.notna()
+    if failed.any():
+        leading = series[failed].astype(str).str.extract(r'^\s*([+-]?\d+)', expand=False)
+        parsed[failed] = pd.to_numeric(leading, errors='coerce')
+    return parsed.astype(float)
+
+
+def parse_datetime_series(dates, hours):
+    """
+    Combine journal date and hour columns into timestamps.
+
+    Args:
+        dates: Series of `dd/mm/yyyy` or `d/m/yy` strings
+        hours: Series of `HH:MM` strings
+
+    Returns:
+        Series of datetime64 (NaT where unparseable)
+    """
+    def parse_day(unique):
+        unique = unique.astype(str).str.strip()
+        parsed = pd.Series(pd.NaT, index=unique.index, dtype='datetime64[ns]')
+        for fmt in DATE_FORMATS:
+            missing = parsed.isna()
+            if not missing.any():
+                break
+            parsed[missing] = pd.to_datetime(unique[missing], format=fmt, errors='coerce')
+        return parsed
+
+    def parse_hour(unique):
+        unique = unique.astype(str).str.strip()
+        return pd.to_datetime(unique, format=HOUR_FORMAT, errors='coerce') - pd.Timestamp('1900-01-01')
+
+    # Days and hours are parsed separately: a few hundred distinct dates and
+    # at most 1440 distinct hours, however many trades
+    return map_distinct(dates, parse_day) + map_distinct(hours, parse_hour)
+
+
+def load_journal(csv_file, phase=None, dropna=True):
+    """
+    Load a Phase 3/4 journal into a normalized DataFrame.
+
+    Original columns are kept as text (except `#`, read as a number when
+    the whole column is numeric); normalized ones are added: `Row` (line
+    number in the CSV), `Bot`, `Symbol`, `Direction`, `Exit_Raison`
+    (stripped, categorical), `PnL_Net`, `Score` (floats), `Trade_No`
+    (parsed `#`), `Entry_Time`, `Exit_Time` and `Phase`
+    (Phase 2 exports only have an entry time, so no `Exit_Time`).
+
+    Args:
+        csv_file: Path to the journal CSV
+        phase: Optional phase label stored in the `Phase` column
+        dropna: Drop the empty template rows (no bot or no PnL)
+
+    Returns:
+        DataFrame with one row per trade
+    """
+    # Plain object columns: the pandas string dtype validates every cell on
+    # read, which doubles the load time of a large journal. `#` is left to
+    # the C parser, which reads a numeric column much faster than we can.
+    columns = pd.read_csv(csv_file, sep=';', nrows=0).columns
+    df = pd.read_csv(csv_file, sep=';', keep_default_na=False, na_values=[''],
+                     dtype={c: object for c in columns if c != '#'})
+
+    # Header is line 1, so data row i lives on line i + 2
+    df['Row'] = df.index + 2
+    df['Phase'] = phase
+
+    for col in ['Bot', 'Symbol', 'Direction', 'Exit_Raison']:
+        if col in df.columns:
+            df[col] = parse_text_series(df[col])
+
+    df['PnL_Net'] = parse_decimal_series(df['PnL_Net'])
+    df['Score'] = parse_decimal_series(df['Score'])
+    if '#' in df.columns:
+        df['Trade_No'] = parse_trade_number(df['#'])
+
+    if 'Date E' in df.columns:
+        df['Entry_Time'] = parse_datetime_series(df['Date E'], df['Heure E'])
+        df['Exit_Time'] = parse_datetime_series(df['Date S'], df['Heure S'])
+    elif 'Date' in df.columns:
+        # Phase 2 exports: a single entry `Date` / `Heure`, no exit time
+        df['Entry_Time'] = parse_datetime_series(df['Date'], df['Heure'])
+
+    if dropna:
+        df = df[df['Bot'].notna() & df['PnL_Net'].notna()].copy()
+
+    return df
+
+
+def load_journals(journals=None, dropna=True):
+    """
+    Load and concatenate several journals.
+
+    Args:
+        journals: Mapping of phase label -> CSV path (defaults to JOURNALS)
+        dropna: Forwarded to load_journal
+
+    Returns:
+        Single DataFrame with a `Phase` column
+    """
+    journals = journals or JOURNALS
+    frames = [load_journal(path, phase=phase, dropna=dropna)
+              for phase, path in journals.items() if Path(path).exists()]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Async Market Data Collector
+Fetches Bitget candles / tickers / open interest for the analytics through
+one pooled HTTP session, instead of one request per call like the bots'
+`safeGetJson`.
+
+Features:
+- Single aiohttp session with a bounded connection pool
+- Token-bucket rate limiter tuned to Bitget's public market limits
+- In-flight deduplication: concurrent requests for the same
+  (symbol, granularity) share one HTTP call
+- Candles persisted locally (one CSV per symbol/granularity, merged on `t`)
+- Ticker / open-interest snapshots appended to timestamped CSVs
+- Benchmark against a local mock of /api/v2/mix/market/candles, compared
+  with the bots' pattern (batches of 5 + sleep(200), new request each time)
+
+Requires: aiohttp
+"""
+
+import sys
+import time
+import asyncio
+import numpy as np
+import pandas as pd
+import aiohttp
+from aiohttp import web
+from pathlib import Path
+
+from journal_loader import BASE_DIR
+
+BITGET_API = "https://api.bitget.com"
+PRODUCT_TYPE = "usdt-futures"
+
+# Bitget public market endpoints: 20 requests/s per IP, enforced on a
+# sliding window. rate + burst <= 20 keeps any 1s window under the limit.
+EXCHANGE_LIMIT_PER_SEC = 20
+RATE_LIMIT_PER_SEC = 15
+RATE_LIMIT_BURST = 5
+
+# Connection pool size of the shared session
+MAX_CONNECTIONS = 10
+
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+
+DATA_DIR = BASE_DIR / "market_data"
+
+CANDLE_COLUMNS = ['t', 'o', 'h', 'l', 'c', 'v']
+
+# Snapshot columns kept from the ticker / open-interest payloads (the fields
+# the bots read), after the collection time
+TICKER_COLUMNS = ['symbol', 'lastPr', 'markPrice', 'high24h', 'low24h', 'change24h',
+                  'usdtVolume', 'fundingRate', 'holdingAmount']
+OPEN_INTEREST_COLUMNS = ['symbol', 'size']
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, at most `capacity` stored.
+
+    acquire() waits until a token is available, so callers are spread out
+    evenly instead of bursting into the exchange's 429s.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def parse_candles(data):
+    """Convert Bitget candle rows into a DataFrame sorted by time (like the bots)."""
+    if not data:
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+    arr = np.asarray([row[:6] for row in data], dtype=float)
+    df = pd.DataFrame(arr, columns=CANDLE_COLUMNS)
+    df['t'] = df['t'].astype(np.int64)
+    return df.sort_values('t', ignore_index=True)
+
+
+class MarketDataCollector:
+    """
+    Shared-session Bitget market data client.
+
+    Use as an async context manager:
+
+        async with MarketDataCollector() as collector:
+            candles = await collector.get_candles('BTCUSDT', 900)
+    """
+
+    def __init__(self, base_url=BITGET_API, rate=RATE_LIMIT_PER_SEC, burst=RATE_LIMIT_BURST,
+                 max_connections=MAX_CONNECTIONS, data_dir=DATA_DIR):
+        self.base_url = base_url.rstrip('/')
+        self.limiter = TokenBucket(rate, burst)
+        self.max_connections = max_connections
+        self.data_dir = Path(data_dir) if data_dir else None
+        self.session = None
+        self.in_flight = {}
+        self.stats = {'requests': 0, 'deduplicated': 0, 'errors': 0, 'retries': 0, 'limiter_wait_s': 0.0}
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            headers={'Accept': 'application/json'},
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def _get_json(self, path, params):
+        """GET through the limiter; returns the JSON body or None (like safeGetJson)."""
+        url = f"{self.base_url}{path}"
+        for attempt in range(MAX_RETRIES):
+            waited = time.monotonic()
+            await self.limiter.acquire()
+            self.stats['limiter_wait_s'] += time.monotonic() - waited
+            self.stats['requests'] += 1
+            try:
+                async with self.session.get(url, params=params) as r:
+                    if r.status == 429:
+                        self.stats['retries'] += 1
+                        await asyncio.sleep(0.5 * (attempt + 1))
+                        continue
+                    if r.status != 200:
+                        self.stats['errors'] += 1
+                        return None
+                    return await r.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.stats['errors'] += 1
+                return None
+        self.stats['errors'] += 1
+        return None
+
+    async def _dedup(self, key, factory):
+        """Share one in-flight request between all callers of the same key."""
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.stats['deduplicated'] += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(factory())
+        self.in_flight[key] = task
+
+        def release(done):
+            if self.in_flight.get(key) is done:
+                del self.in_flight[key]
+
+        task.add_done_callback(release)
+        return await asyncio.shield(task)
+
+    async def get_candles(self, symbol, granularity, limit=100):
+        """
+        Candles for one symbol, granularity in seconds (as the bots pass it).
+
+        Concurrent calls for the same (symbol, granularity, limit) share a
+        single request.
+        """
+        async def fetch():
+            j = await self._get_json('/api/v2/mix/market/candles', {
+                'symbol': symbol, 'granularity': str(granularity),
+                'productType': PRODUCT_TYPE, 'limit': str(limit),
+            })
+            return parse_candles((j or {}).get('data'))
+
+        return await self._dedup(('candles', symbol, granularity, limit), fetch)
+
+    async def get_ticker(self, symbol):
+        """Ticker dict for one symbol (or None)."""
+        async def fetch():
+            j = await self._get_json('/api/v2/mix/market/ticker',
+                                     {'symbol': symbol, 'productType': PRODUCT_TYPE})
+            data = (j or {}).get('data')
+            return data[0] if isinstance(data, list) and data else data
+
+        return await self._dedup(('ticker', symbol), fetch)
+
+    async def get_open_interest(self, symbol):
+        """Open interest dict ({symbol, size}) for one symbol (or None)."""
+        async def fetch():
+            j = await self._get_json('/api/v2/mix/market/open-interest',
+                                     {'symbol': symbol, 'productType': PRODUCT_TYPE})
+            # Bitget API v2 returns { data: { openInterestList: [ { symbol, size }, ... ] } }
+            data = (j or {}).get('data')
+            listed = data.get('openInterestList') if isinstance(data, dict) else None
+            return listed[0] if listed else data
+
+        return await self._dedup(('oi', symbol), fetch)
+
+    def persist_candles(self, symbol, granularity, candles):
+        """Merge candles into market_data/candles/<symbol>_<granularity>.csv."""
+        if self.data_dir is None or len(candles) == 0:
+            return None
+        path = self.data_dir / "candles" / f"{symbol}_{granularity}.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            candles = pd.concat([pd.read_csv(path), candles], ignore_index=True)
+        candles = candles.drop_duplicates('t', keep='last').sort_values('t')
+        candles.to_csv(path, index=False)
+        return path
+
+    def _append_snapshot(self, name, snapshots, columns):
+        """Append one timestamped row per symbol to market_data/<name>.csv."""
+        rows = [{'symbol': symbol, **snapshot} for symbol, snapshot in snapshots.items()
+                if isinstance(snapshot, dict)]
+        if self.data_dir is None or not rows:
+            return None
+        df = pd.DataFrame(rows).reindex(columns=columns)
+        df.insert(0, 'time', pd.Timestamp.now(tz='UTC').isoformat(timespec='seconds'))
+        path = self.data_dir / f"{name}.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(path, mode='a', header=not path.exists(), index=False)
+        return path
+
+    def persist_tickers(self, tickers):
+        """Append {symbol: ticker} snapshots to market_data/tickers.csv."""
+        return self._append_snapshot('tickers', tickers, TICKER_COLUMNS)
+
+    def persist_open_interest(self, open_interest):
+        """Append {symbol: open interest} snapshots to market_data/open_interest.csv."""
+        return self._append_snapshot('open_interest', open_interest, OPEN_INTEREST_COLUMNS)
+
+    async def collect_snapshots(self, symbols, persist=True):
+        """
+        Fetch ticker and open interest for every symbol concurrently and
+        optionally append them to the snapshot CSVs.
+
+        Returns:
+            (tickers, open_interest) dictionaries keyed by symbol
+        """
+        symbols = list(dict.fromkeys(symbols))
+        tickers, oi = await asyncio.gather(
+            asyncio.gather(*(self.get_ticker(s) for s in symbols)),
+            asyncio.gather(*(self.get_open_interest(s) for s in symbols)),
+        )
+        tickers, oi = dict(zip(symbols, tickers)), dict(zip(symbols, oi))
+
+        if persist:
+            await asyncio.gather(asyncio.to_thread(self.persist_tickers, tickers),
+                                 asyncio.to_thread(self.persist_open_interest, oi))
+        return tickers, oi
+
+    async def collect_candles(self, symbols, granularities, limit=100, persist=True):
+        """
+        Fetch every symbol x granularity concurrently and optionally persist.
+
+        Returns:
+            Dictionary (symbol, granularity) -> candles DataFrame
+        """
+        keys = [(s, g) for s in dict.fromkeys(symbols) for g in granularities]
+        frames = await asyncio.gather(*(self.get_candles(s, g, limit) for s, g in keys))
+        results = dict(zip(keys, frames))
+
+        if persist:
+            await asyncio.gather(*(asyncio.to_thread(self.persist_candles, s, g, df)
+                                   for (s, g), df in results.items()))
+        return results
+
+
+# ==========================================================
+# BENCHMARK (local mock of the candles endpoint)
+# ==========================================================
+
+MOCK_LATENCY = 0.05
+
+
+def create_mock_app(latency=MOCK_LATENCY, rate_limit=EXCHANGE_LIMIT_PER_SEC):
+    """
+    aiohttp app mimicking /api/v2/mix/market/candles, with fixed latency and
+    a 1s sliding-window rate limit that answers 429 like Bitget.
+
+    Request counters live in app['state'] ('requests', 'accepted', 'throttled').
+    """
+    app = web.Application()
+    state = {'requests': 0, 'accepted': [], 'throttled': 0}
+    app['state'] = state
+
+    async def candles(request):
+        now = time.monotonic()
+        state['requests'] += 1
+        accepted = state['accepted']
+        if sum(1 for t in accepted[-rate_limit:] if now - t < 1) >= rate_limit:
+            state['throttled'] += 1
+            return web.json_response({'code': '429', 'msg': 'Too Many Requests'}, status=429)
+        accepted.append(now)
+
+        await asyncio.sleep(latency)
+        limit = int(request.query.get('limit', 100))
+        granularity = int(request.query.get('granularity', 60))
+        end = int(time.time()) // granularity * granularity * 1000
+        rows = [[str(end - i * granularity * 1000), '1', '1.1', '0.9', '1.05', '100', '105']
+                for i in range(limit)]
+        return web.json_response({'code': '00000', 'msg': 'success', 'data': rows})
+
+    app.router.add_get('/api/v2/mix/market/candles', candles)
+    return app
+
+
+async def _naive_fetch(base_url, symbol, granularity, limit):
+    """The bots' pattern: a brand new connection for every call."""
+    async with aiohttp.ClientSession() as session:
+        try:
+            async with session.get(f"{base_url}/api/v2/mix/market/candles", params={
+                'symbol': symbol, 'granularity': str(granularity),
+                'productType': PRODUCT_TYPE, 'limit': str(limit),
+            }) as r:
+                return await r.json() if r.status == 200 else None
+        except aiohttp.ClientError:
+            return None
+
+
+async def run_benchmark(n_symbols=40, granularities=(900, 3600), n_bots=3, limit=100):
+    """
+    Compare the pooled collector with the bots' batch-of-5 + sleep(200)
+    pattern on a local mock. Every bot asks for the same symbols, which is
+    what mqi.js / swing.js / autoselect.js do today.
+
+    Returns:
+        Dictionary with the two runs' metrics
+    """
+    app = create_mock_app()
+    state = app['state']
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    symbols = [f"SYM{i}USDT" for i in range(n_symbols)]
+    calls = [(s, g) for _ in range(n_bots) for s in symbols for g in granularities]
+    results = {}
+
+    def reset_state():
+        state.update(requests=0, throttled=0)
+        state['accepted'].clear()
+
+    # Baseline: each bot loops over its symbols in batches of 5, then sleeps 200ms
+    reset_state()
+    latencies, ok = [], []
+
+    async def timed_naive(s, g):
+        t0 = time.perf_counter()
+        j = await _naive_fetch(base_url, s, g, limit)
+        latencies.append(time.perf_counter() - t0)
+        ok.append(bool(j and j.get('data')))
+
+    async def naive_bot():
+        jobs = [(s, g) for s in symbols for g in granularities]
+        for i in range(0, len(jobs), 5):
+            await asyncio.gather(*(timed_naive(s, g) for s, g in jobs[i:i + 5]))
+            await asyncio.sleep(0.2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(naive_bot() for _ in range(n_bots)))
+    results['naive'] = {
+        'calls': len(calls), 'successful': sum(ok),
+        'http_requests': state['requests'], 'throttled': state['throttled'],
+        'elapsed': time.perf_counter() - start, 'latencies': np.array(latencies),
+        'ok': np.array(ok, dtype=bool),
+    }
+
+    # Pooled collector: all bots' calls issued at once, deduplicated and rate limited
+    reset_state()
+    latencies, ok = [], []
+
+    async with MarketDataCollector(base_url=base_url, data_dir=None) as collector:
+        async def timed_pooled(s, g):
+            t0 = time.perf_counter()
+            candles = await collector.get_candles(s, g, limit)
+            latencies.append(time.perf_counter() - t0)
+            ok.append(len(candles) > 0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(timed_pooled(s, g) for s, g in calls))
+        results['pooled'] = {
+            'calls': len(calls), 'successful': sum(ok),
+            'http_requests': state['requests'], 'throttled': state['throttled'],
+            'elapsed': time.perf_counter() - start, 'latencies': np.array(latencies),
+            'ok': np.array(ok, dtype=bool),
+            'deduplicated': collector.stats['deduplicated'],
+            'limiter_wait': collector.stats['limiter_wait_s'],
+        }
+
+    await runner.cleanup()
+    return results
+
+
+def print_benchmark(results):
+    """
+    Print the benchmark comparison.
+
+    Latencies are over successful calls only (a 429 fails fast and would
+    flatter the bots' pattern). HTTP requests/s (what the exchange sees) is
+    reported separately from calls served/s (what the bots get, including
+    the pooled calls answered by deduplication).
+    """
+    print("=" * 90)
+    print("MARKET DATA COLLECTOR BENCHMARK (local mock /api/v2/mix/market/candles)")
+    print("=" * 90)
+    print(f"Mock latency: {MOCK_LATENCY * 1000:.0f}ms | Exchange limit: {EXCHANGE_LIMIT_PER_SEC} req/s | "
+          f"Bucket: {RATE_LIMIT_PER_SEC} req/s + burst {RATE_LIMIT_BURST} | Pool: {MAX_CONNECTIONS} connections")
+
+    p50 = {}
+    for name, label in [('naive', 'BOTS PATTERN (batch 5 + sleep 200ms)'), ('pooled', 'POOLED COLLECTOR')]:
+        r = results[name]
+        ok_lat = r['latencies'][r['ok']] * 1000
+        p50[name] = np.percentile(ok_lat, 50) if len(ok_lat) else np.nan
+        p95 = np.percentile(ok_lat, 95) if len(ok_lat) else np.nan
+        print(f"\n📊 {label}")
+        print(f"   Calls:          {r['calls']} ({r['successful']} with data, "
+              f"{r['calls'] - r['successful']} failed)")
+        print(f"   HTTP Requests:  {r['http_requests']} ({r['throttled']} throttled with 429) | "
+              f"{r['http_requests'] / r['elapsed']:.1f} req/s sent")
+        if 'deduplicated' in r:
+            print(f"   Deduplicated:   {r['deduplicated']} calls answered by a shared request")
+        print(f"   Elapsed:        {r['elapsed']:.2f}s")
+        print(f"   Calls served:   {r['successful'] / r['elapsed']:.1f} successful calls/s")
+        print(f"   Latency (ok):   p50 {p50[name]:.0f}ms | p95 {p95:.0f}ms")
+
+    naive, pooled = results['naive'], results['pooled']
+    http_ok = pooled['http_requests'] - pooled['throttled']
+    avg_wait = pooled['limiter_wait'] / max(pooled['http_requests'], 1) * 1000
+    print(f"\n🎯 Summary:")
+    print(f"   Successful calls: {naive['successful']}/{naive['calls']} → "
+          f"{pooled['successful']}/{pooled['calls']}, with {naive['throttled']} → {pooled['throttled']} 429s")
+    print(f"   Exchange load:    {naive['http_requests']} → {pooled['http_requests']} HTTP requests "
+          f"({http_ok} useful, {http_ok / pooled['elapsed']:.1f} req/s under the {EXCHANGE_LIMIT_PER_SEC} req/s limit)")
+    print(f"   Latency cost:     p50 {p50['naive']:.0f}ms → {p50['pooled']:.0f}ms per successful call. "
+          f"All calls are queued at once")
+    print(f"                     and drained at {RATE_LIMIT_PER_SEC} req/s: average limiter wait "
+          f"{avg_wait:.0f}ms per request, up to ~{pooled['http_requests'] / RATE_LIMIT_PER_SEC:.1f}s for the last one")
+    print("=" * 90)
+
+
+async def _collect(symbols, granularities):
+    async with MarketDataCollector() as collector:
+        results = await collector.collect_candles(symbols, granularities)
+        tickers, oi = await collector.collect_snapshots(symbols)
+        snapshots = sum(v is not None for v in [*tickers.values(), *oi.values()])
+        print(f"✅ Collected {len(results)} series + {snapshots} snapshots → {DATA_DIR} | {collector.stats}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        print_benchmark(asyncio.run(run_benchmark()))
+    else:
+        # Default: BTC/ETH/SOL (MAJORS universe) on the bots' 15m and 1h granularities
+        asyncio.run(_collect(sys.argv[1:] or ['BTCUSDT', 'ETHUSDT', 'SOLUSDT'], [900, 3600]))
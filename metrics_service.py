@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Local Metrics Service
+Keeps the Phase 3/4 journals parsed in memory and serves the usual
+analytics as JSON, so dashboards don't re-run the offline scripts.
+
+Features:
+- Journals are re-parsed only when their file changes (mtime/size poll)
+- Query results are cached; a journal change invalidates only the cached
+  queries that depend on that journal
+- Standard library HTTP server, bound to localhost
+
+Endpoints:
+    GET /health
+    GET /stats/bots?phase=Phase 3
+    GET /stats/scores?phase=Phase 3&bot=DEGEN
+    GET /equity?phase=Phase 4&bot=DISCOVERY
+    GET /phases
+"""
+
+import json
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from journal_loader import JOURNALS, VALID_REASONS, WIN_REASONS, load_journal
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+# Seconds between two checks of the journal files
+POLL_INTERVAL = 1.0
+
+SCORE_BINS = [0, 80, 85, 90, 100]
+SCORE_LABELS = ['<80', '80-85', '85-90', '>90']
+
+
+def _round(value, digits=4):
+    """Round for JSON output, mapping NaN/inf to None."""
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), digits)
+
+
+def bot_stats(df):
+    """Per-bot trade count, PnL, win rate and long/short split."""
+    is_win = df['Exit_Raison'].isin(WIN_REASONS)
+    is_valid = df['Exit_Raison'].isin(VALID_REASONS)
+    is_long = df['Direction'] == 'LONG'
+
+    grouped = df.assign(
+        Win=is_win, Valid=is_valid,
+        PnL_Long=df['PnL_Net'].where(is_long, 0.0),
+        PnL_Short=df['PnL_Net'].where(~is_long, 0.0),
+    ).groupby('Bot').agg(
+        Trades=('PnL_Net', 'size'),
+        PnL_Sum=('PnL_Net', 'sum'),
+        PnL_Avg=('PnL_Net', 'mean'),
+        Wins=('Win', 'sum'),
+        Valid=('Valid', 'sum'),
+        PnL_Long=('PnL_Long', 'sum'),
+        PnL_Short=('PnL_Short', 'sum'),
+        Score_Avg=('Score', 'mean'),
+    )
+
+    return {
+        bot: {
+            'trades': int(row['Trades']),
+            'pnl_sum': _round(row['PnL_Sum']),
+            'pnl_avg': _round(row['PnL_Avg']),
+            'win_rate': _round(row['Wins'] / row['Valid'] * 100 if row['Valid'] else 0, 2),
+            'pnl_long': _round(row['PnL_Long']),
+            'pnl_short': _round(row['PnL_Short']),
+            'score_avg': _round(row['Score_Avg'], 2),
+        }
+        for bot, row in grouped.iterrows()
+    }
+
+
+def score_buckets(df):
+    """Win rate and PnL per bot and score range (see compare_scoring.py)."""
+    score_range = pd.cut(df['Score'], bins=SCORE_BINS, labels=SCORE_LABELS)
+    grouped = df.assign(
+        Score_Range=score_range,
+        Win=df['Exit_Raison'].isin(WIN_REASONS),
+        Valid=df['Exit_Raison'].isin(VALID_REASONS),
+    ).groupby(['Bot', 'Score_Range'], observed=True).agg(
+        Count=('PnL_Net', 'size'),
+        PnL_Sum=('PnL_Net', 'sum'),
+        Wins=('Win', 'sum'),
+        Valid=('Valid', 'sum'),
+    )
+
+    result = {}
+    for (bot, label), row in grouped.iterrows():
+        result.setdefault(bot, {})[label] = {
+            'count': int(row['Count']),
+            'pnl_sum': _round(row['PnL_Sum']),
+            'win_rate': _round(row['Wins'] / row['Valid'] * 100 if row['Valid'] else 0, 2),
+        }
+    return result
+
+
+def equity_curve(df):
+    """Cumulative PnL ordered by exit time."""
+    ordered = df.sort_values(['Exit_Time', 'Row'], kind='stable')
+    equity = ordered['PnL_Net'].cumsum()
+    return [
+        {'time': t.isoformat() if pd.notna(t) else None, 'bot': bot, 'pnl': _round(p), 'equity': _round(e)}
+        for t, bot, p, e in zip(ordered['Exit_Time'], ordered['Bot'], ordered['PnL_Net'], equity)
+    ]
+
+
+class MetricsStore:
+    """
+    In-memory journals plus a dependency-tracked result cache.
+
+    Each cached query remembers which phases it was computed from; when a
+    journal changes, only those entries are dropped. Misses are computed
+    outside the lock, so cache hits never wait behind a slow query.
+    """
+
+    def __init__(self, journals=None):
+        self.journals = {phase: Path(path) for phase, path in (journals or JOURNALS).items()}
+        self.frames = {}
+        self.signatures = {}
+        self.failed = {}
+        self.cache = {}
+        self.versions = {phase: 0 for phase in self.journals}
+        self.stats = {'hits': 0, 'misses': 0, 'reloads': 0}
+        self.lock = threading.RLock()
+        self.refresh()
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self):
+        """
+        Re-parse the journals whose file changed since the last check.
+
+        Returns:
+            List of phases that were reloaded
+        """
+        changed = []
+        for phase, path in self.journals.items():
+            signature = self._signature(path)
+            if signature == self.signatures.get(phase) and phase in self.frames:
+                continue
+            # Same malformed (or mid-save) file as last time: wait for it to change
+            if signature is not None and signature == self.failed.get(phase):
+                continue
+
+            try:
+                frame = load_journal(path, phase=phase) if signature else pd.DataFrame()
+            except Exception as e:
+                self.failed[phase] = signature
+                print(f"⚠️  {phase}: journal reload failed, keeping previous data ({e})")
+                continue
+
+            with self.lock:
+                self.failed.pop(phase, None)
+                self.frames[phase] = frame
+                self.signatures[phase] = signature
+                self.versions[phase] += 1
+                self.stats['reloads'] += 1
+                self._invalidate(phase)
+            changed.append(phase)
+        return changed
+
+    def _invalidate(self, phase):
+        """Drop cached queries that depend on the given phase."""
+        self.cache = {key: entry for key, entry in self.cache.items() if phase not in entry['deps']}
+
+    @staticmethod
+    def _frame(frames, phases, bot=None):
+        frames = [frames[p] for p in phases if len(frames.get(p, ()))]
+        if not frames:
+            return pd.DataFrame(columns=['Bot', 'PnL_Net', 'Score', 'Exit_Raison', 'Direction', 'Exit_Time', 'Row'])
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        return df[df['Bot'] == bot] if bot else df
+
+    def query(self, name, phase=None, bot=None):
+        """
+        Return a cached or freshly computed query result.
+
+        Args:
+            name: One of 'bots', 'scores', 'equity', 'phases'
+            phase: Restrict to one phase (default: all journals)
+            bot: Restrict to one bot ('scores' and 'equity' only)
+
+        Returns:
+            (result, cache_hit)
+        """
+        if name not in QUERIES:
+            raise KeyError(f"Unknown query: {name}")
+        if phase is not None and phase not in self.journals:
+            raise KeyError(f"Unknown phase: {phase}")
+        if bot is not None and name not in BOT_QUERIES:
+            raise KeyError(f"Parameter 'bot' is not supported by '{name}'")
+
+        deps = (phase,) if phase else tuple(self.journals)
+        key = (name, phase, bot)
+
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.stats['hits'] += 1
+                return entry['result'], True
+            self.stats['misses'] += 1
+            versions = {p: self.versions[p] for p in deps}
+            frames = {p: self.frames.get(p) for p in deps}
+
+        # Frames are replaced, never mutated, so this snapshot is safe to
+        # use without the lock
+        if name == 'bots':
+            result = bot_stats(self._frame(frames, deps))
+        elif name == 'scores':
+            result = score_buckets(self._frame(frames, deps, bot))
+        elif name == 'equity':
+            result = equity_curve(self._frame(frames, deps, bot))
+        else:
+            result = {p: bot_stats(self._frame(frames, (p,))) for p in deps}
+
+        with self.lock:
+            # Don't cache a result computed from a journal reloaded meanwhile
+            if all(self.versions[p] == v for p, v in versions.items()):
+                self.cache[key] = {'result': result, 'deps': set(deps)}
+        return result, False
+
+    def health(self):
+        """Loaded journals, their row counts and cache counters."""
+        with self.lock:
+            return {
+                'journals': {p: {'rows': len(self.frames.get(p, ())), 'version': v}
+                             for p, v in self.versions.items()},
+                'cache_entries': len(self.cache),
+                'failed_reloads': sorted(self.failed),
+                **self.stats,
+            }
+
+
+class JournalWatcher(threading.Thread):
+    """Background thread polling the journal files for changes."""
+
+    def __init__(self, store, interval=POLL_INTERVAL):
+        super().__init__(daemon=True)
+        self.store = store
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                changed = self.store.refresh()
+            except Exception as e:
+                print(f"⚠️  Journal reload failed: {e}")
+                continue
+            if changed:
+                print(f"🔄 Reloaded: {', '.join(changed)}")
+
+    def stop(self):
+        self.stopped.set()
+
+
+QUERIES = ('bots', 'scores', 'equity', 'phases')
+
+# Queries that accept a bot filter
+BOT_QUERIES = ('scores', 'equity')
+
+ROUTES = {
+    '/stats/bots': 'bots',
+    '/stats/scores': 'scores',
+    '/equity': 'equity',
+    '/phases': 'phases',
+}
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """JSON endpoints backed by the server's MetricsStore."""
+
+    def _send_json(self, status, payload, cache=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if cache is not None:
+            self.send_header('X-Cache', 'HIT' if cache else 'MISS')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        store = self.server.store
+
+        if url.path == '/health':
+            self._send_json(200, store.health())
+            return
+
+        name = ROUTES.get(url.path)
+        if name is None:
+            self._send_json(404, {'error': f"Unknown endpoint: {url.path}"})
+            return
+
+        try:
+            result, hit = store.query(name, phase=params.get('phase'), bot=params.get('bot'))
+        except KeyError as e:
+            self._send_json(400, {'error': str(e.args[0])})
+            return
+        self._send_json(200, result, cache=hit)
+
+    def log_message(self, format, *args):
+        # Dashboards poll often; keep stdout for reloads and errors
+        pass
+
+
+def create_server(host=HOST, port=PORT, journals=None, poll_interval=POLL_INTERVAL):
+    """
+    Build the HTTP server with its store and (not yet started) watcher.
+
+    Use port=0 to let the OS pick a free port (server.server_address).
+
+    Returns:
+        ThreadingHTTPServer with `.store` and `.watcher` attributes
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.store = MetricsStore(journals)
+    server.watcher = JournalWatcher(server.store, poll_interval)
+    return server
+
+
+def serve(host=HOST, port=PORT, journals=None):
+    """Start the watcher and serve until interrupted."""
+    server = create_server(host, port, journals)
+    server.watcher.start()
+    print(f"📡 Metrics service on http://{host}:{server.server_address[1]}")
+    for phase, info in server.store.health()['journals'].items():
+        print(f"   {phase:8s} → {info['rows']} trades")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.watcher.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
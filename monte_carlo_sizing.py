@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Position Sizing & Risk of Ruin Simulator
+Resamples each bot's empirical per-trade returns to estimate how the
+BOT_CONFIGS bets (and alternative sizing rules) behave over many futures.
+
+Features:
+- Per-trade returns expressed in "bet units" (PnL / configured bet)
+- Streak-block bootstrap: win/loss/BE runs are resampled whole and always
+  followed by a run of another outcome, so simulated streaks keep the
+  observed run lengths (checked against the journal in the report)
+- 100k+ paths simulated as chunked NumPy arrays across all cores
+- Risk of ruin, drawdown and terminal-equity percentiles per bot and for
+  the combined portfolio
+- Shared calendar horizon: each bot trades at its observed rate, so the
+  portfolio adds up equity at the same point in time
+
+Bots are resampled independently of each other: the PORTFOLIO row assumes
+no cross-bot correlation (analyze_exposure.py measures it), so its risk of
+ruin is a model output, not a measured one.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from analyze_trading_bots import BE_THRESHOLD, analyze_trading_performance
+from journal_loader import get_bot_config, load_journals
+
+# Number of simulated equity paths and paths per worker chunk
+N_PATHS = 100_000
+CHUNK_SIZE = 10_000
+
+# Starting capital per bot, in bets (10 bets = 100 USDT for DEGEN)
+STARTING_CAPITAL_BETS = 10
+
+# A path is ruined once equity falls to this fraction of its starting capital
+RUIN_LEVEL = 0.5
+
+# Calendar horizon of each path, as a multiple of the journal's time span
+HORIZON_MULTIPLE = 1.0
+
+# Trade rates are measured over at least this many days of activity
+MIN_ACTIVE_DAYS = 1.0
+
+# Sizing rules: 'fixed' stakes bet * scale on every trade,
+# 'fractional' stakes the same fraction of *current* equity (compounding)
+SIZING_RULES = {
+    'FIXED': {'mode': 'fixed', 'scale': 1.0},
+    'FIXED_x1.5': {'mode': 'fixed', 'scale': 1.5},
+    'FIXED_x2': {'mode': 'fixed', 'scale': 2.0},
+    'FRACTIONAL': {'mode': 'fractional', 'scale': 1.0},
+    'FRACTIONAL_x2': {'mode': 'fractional', 'scale': 2.0},
+}
+
+PORTFOLIO = 'PORTFOLIO'
+
+PERCENTILES = [5, 50, 95, 99]
+
+# Paths used to compare simulated and observed streaks
+STREAK_CHECK_PATHS = 2000
+
+
+def build_return_streams(df, bot_col='Bot', pnl_col='PnL_Net', time_col='Entry_Time'):
+    """
+    Build per-bot return series in bet units, in chronological order.
+
+    Args:
+        df: Trades DataFrame (journal or classified Bitget export)
+        bot_col: Column holding the bot name
+        pnl_col: Column holding the net PnL in USDT
+        time_col: Column used to order trades
+
+    Returns:
+        Dictionary bot name -> {'returns': ndarray, 'bet': float,
+        'start': Timestamp, 'end': Timestamp}
+    """
+    streams = {}
+    df = df[df[pnl_col].notna()].sort_values(time_col, kind='stable')
+
+    for bot_name, trades in df.groupby(bot_col, sort=True):
+        config = get_bot_config(bot_name)
+        if config is None or len(trades) < 2:
+            continue
+        streams[bot_name] = {
+            'returns': trades[pnl_col].to_numpy(dtype=float) / config['bet'],
+            'bet': float(config['bet']),
+            'start': trades[time_col].min(),
+            'end': trades[time_col].max(),
+        }
+
+    return streams
+
+
+def trade_horizons(streams, multiple=HORIZON_MULTIPLE):
+    """
+    Number of trades each bot makes over the shared calendar horizon.
+
+    Each bot's rate is its trade count over its own active span (first to
+    last trade); the shared horizon is the span covered by all journals,
+    times `multiple`. Without usable timestamps, falls back to the
+    observed trade count times `multiple`.
+
+    Returns:
+        Dictionary bot name -> horizon in trades
+    """
+    starts = pd.Series([s['start'] for s in streams.values()])
+    ends = pd.Series([s['end'] for s in streams.values()])
+    calendar_days = (ends.max() - starts.min()) / pd.Timedelta(days=1)
+
+    horizons = {}
+    for bot_name, s in streams.items():
+        n_trades = len(s['returns'])
+        active_days = (s['end'] - s['start']) / pd.Timedelta(days=1)
+        if pd.isna(calendar_days) or pd.isna(active_days) or calendar_days <= 0:
+            horizons[bot_name] = max(1, int(round(n_trades * multiple)))
+            continue
+        rate = n_trades / max(active_days, MIN_ACTIVE_DAYS)
+        horizons[bot_name] = max(1, int(round(rate * calendar_days * multiple)))
+    return horizons
+
+
+def trade_outcomes(returns, be_threshold):
+    """
+    Outcome of each trade: 1 (WIN), -1 (LOSS) or 0 (BE), where BE uses the
+    same threshold as the analyzer (expressed in bet units).
+    """
+    outcome = np.sign(returns).astype(np.int8)
+    outcome[np.abs(returns) <= be_threshold] = 0
+    return outcome
+
+
+def streak_blocks(returns, be_threshold):
+    """
+    Split a return series into maximal runs of the same outcome.
+
+    Returns:
+        (block_starts, block_end, outcome) where block_end[i] is the
+        exclusive end of the block containing trade i and outcome[i] the
+        trade's outcome (see trade_outcomes)
+    """
+    outcome = trade_outcomes(returns, be_threshold)
+
+    is_start = np.ones(len(returns), dtype=bool)
+    is_start[1:] = outcome[1:] != outcome[:-1]
+    block_starts = np.flatnonzero(is_start)
+
+    block_ends = np.append(block_starts[1:], len(returns))
+    block_end = np.repeat(block_ends, np.diff(np.append(block_starts, len(returns))))
+
+    return block_starts, block_end, outcome
+
+
+def sample_block_indices(block_starts, block_end, outcome, n_paths, horizon, rng):
+    """
+    Draw trade indices for n_paths paths by chaining random streak blocks.
+
+    Each path starts at a random block, walks through it trade by trade and
+    jumps to a random block of a *different* outcome once the current one
+    is exhausted. Runs are maximal in the journal, so chaining two runs of
+    the same outcome would merge them into a streak that was never
+    observed; alternating keeps the simulated streak lengths on the
+    observed run-length distribution.
+
+    Returns:
+        int32 array of shape (n_paths, horizon)
+    """
+    # Candidate next blocks for each outcome (all blocks if only one outcome)
+    block_outcome = outcome[block_starts]
+    next_blocks = {}
+    for o in np.unique(block_outcome):
+        others = block_starts[block_outcome != o]
+        next_blocks[o] = others if len(others) else block_starts
+
+    idx = np.empty((n_paths, horizon), dtype=np.int32)
+    pos = block_starts[rng.integers(len(block_starts), size=n_paths)]
+
+    for t in range(horizon):
+        idx[:, t] = pos
+        pos = pos + 1
+        jump = pos >= block_end[idx[:, t]]
+        if not jump.any():
+            continue
+        current = outcome[idx[:, t]]
+        for o, candidates in next_blocks.items():
+            sel = jump & (current == o)
+            n_sel = int(sel.sum())
+            if n_sel:
+                pos[sel] = candidates[rng.integers(len(candidates), size=n_sel)]
+
+    return idx
+
+
+def streak_profile(outcomes):
+    """
+    Longest losing streak and share of consecutive trades with the same
+    outcome, per row of a (n_paths, n_trades) outcome matrix.
+
+    Returns:
+        (longest_loss, same_share) arrays
+    """
+    outcomes = np.atleast_2d(outcomes)
+    losing = np.zeros(outcomes.shape[0], dtype=np.int64)
+    longest = np.zeros(outcomes.shape[0], dtype=np.int64)
+    for t in range(outcomes.shape[1]):
+        losing = np.where(outcomes[:, t] == -1, losing + 1, 0)
+        longest = np.maximum(longest, losing)
+    same = (outcomes[:, 1:] == outcomes[:, :-1]).mean(axis=1) if outcomes.shape[1] > 1 else np.zeros(len(outcomes))
+    return longest, same
+
+
+def check_streaks(streams, n_paths=STREAK_CHECK_PATHS, seed=0):
+    """
+    Compare simulated streaks with the observed ones, on paths as long as
+    each bot's journal.
+
+    Returns:
+        DataFrame per bot: observed and simulated (mean / p95) longest losing
+        streak, observed and simulated same-outcome share
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for bot_name, s in streams.items():
+        block_starts, block_end, outcome = streak_blocks(s['returns'], BE_THRESHOLD / s['bet'])
+        idx = sample_block_indices(block_starts, block_end, outcome, n_paths, len(outcome), rng)
+        obs_longest, obs_same = streak_profile(outcome)
+        sim_longest, sim_same = streak_profile(outcome[idx])
+        rows.append({
+            'Bot': bot_name,
+            'Loss_Streak_Obs': int(obs_longest[0]),
+            'Loss_Streak_Sim': sim_longest.mean(),
+            'Loss_Streak_Sim_p95': np.percentile(sim_longest, 95),
+            'Same_Obs': obs_same[0],
+            'Same_Sim': sim_same.mean(),
+        })
+    return pd.DataFrame(rows)
+
+
+def apply_ruin(equity, ruin_equity):
+    """
+    Freeze every path at its equity on the first step it hits the ruin level.
+
+    Returns:
+        (frozen equity, ruined flag per path)
+    """
+    hit = equity <= ruin_equity
+    ruined = hit.any(axis=1)
+    if ruined.any():
+        first = np.argmax(hit, axis=1)
+        steps = np.arange(equity.shape[1])
+        after = ruined[:, None] & (steps[None, :] > first[:, None])
+        frozen = equity[np.arange(len(equity)), first]
+        equity = np.where(after, frozen[:, None], equity)
+    return equity, ruined
+
+
+def path_stats(equity, capital):
+    """
+    Compute terminal equity and max drawdown (fraction of peak) per path.
+    """
+    peak = np.maximum.accumulate(np.maximum(equity, capital), axis=1)
+    drawdown = 1 - equity / peak
+    return equity[:, -1], drawdown.max(axis=1)
+
+
+def simulate_equity(returns, rule, bet, capital):
+    """
+    Turn a (n_paths, horizon) matrix of bet-unit returns into equity paths.
+
+    Args:
+        returns: Sampled returns in bet units
+        rule: SIZING_RULES entry
+        bet: Configured bet in USDT
+        capital: Starting capital in USDT
+
+    Returns:
+        Equity matrix of shape (n_paths, horizon)
+    """
+    stake = bet * rule['scale']
+
+    if rule['mode'] == 'fixed':
+        return capital + np.cumsum(returns * stake, axis=1)
+
+    # Fractional: stake scales with equity, so growth factors compound
+    growth = np.clip(1 + returns * (stake / capital), 0, None)
+    return capital * np.cumprod(growth, axis=1)
+
+
+def _simulate_chunk(args):
+    """Worker: simulate one chunk of paths for every rule and bot."""
+    streams, rules, n_paths, seed = args
+    rng = np.random.default_rng(seed)
+
+    # Common random numbers: every rule is evaluated on the same trade sequences
+    sampled = {}
+    for bot_name, s in streams.items():
+        idx = sample_block_indices(s['block_starts'], s['block_end'], s['outcome'],
+                                   n_paths, s['horizon'], rng)
+        sampled[bot_name] = s['returns'][idx]
+
+    # Portfolio grid: one step per trade of the most active bot; every bot's
+    # trades are spread evenly over the same calendar span
+    horizon = max(s['horizon'] for s in streams.values())
+    steps = np.arange(1, horizon + 1)
+    results = {}
+
+    for rule_name, rule in rules.items():
+        results[rule_name] = {}
+        portfolio_equity = np.zeros((n_paths, horizon))
+        portfolio_capital = 0.0
+
+        for bot_name, s in streams.items():
+            capital = s['bet'] * STARTING_CAPITAL_BETS
+            equity = simulate_equity(sampled[bot_name], rule, s['bet'], capital)
+            equity, ruined = apply_ruin(equity, capital * RUIN_LEVEL)
+            terminal, max_dd = path_stats(equity, capital)
+            results[rule_name][bot_name] = {
+                'terminal': terminal, 'max_dd': max_dd, 'ruined': ruined,
+            }
+
+            # Equity after the trades this bot has closed by each portfolio step
+            done = steps * s['horizon'] // horizon
+            start = np.full((n_paths, 1), capital)
+            portfolio_equity += np.concatenate([start, equity], axis=1)[:, done]
+            portfolio_capital += capital
+
+        portfolio_equity, ruined = apply_ruin(portfolio_equity, portfolio_capital * RUIN_LEVEL)
+        terminal, max_dd = path_stats(portfolio_equity, portfolio_capital)
+        results[rule_name][PORTFOLIO] = {
+            'terminal': terminal, 'max_dd': max_dd, 'ruined': ruined,
+        }
+
+    return results
+
+
+def run_simulation(streams, rules=None, n_paths=N_PATHS, chunk_size=CHUNK_SIZE,
+                   seed=42, max_workers=None):
+    """
+    Run the Monte Carlo simulation across all cores.
+
+    Args:
+        streams: Output of build_return_streams
+        rules: Sizing rules to compare (defaults to SIZING_RULES)
+        n_paths: Total number of simulated paths
+        chunk_size: Paths per worker task
+        seed: Root seed (chunks get independent child seeds)
+        max_workers: Process count (defaults to os.cpu_count())
+
+    Returns:
+        Nested dict rule -> bot -> {'terminal', 'max_dd', 'ruined'} arrays
+    """
+    rules = rules or SIZING_RULES
+    horizons = trade_horizons(streams)
+    prepared = {}
+    for bot_name, s in streams.items():
+        block_starts, block_end, outcome = streak_blocks(s['returns'], BE_THRESHOLD / s['bet'])
+        prepared[bot_name] = {
+            **s,
+            'block_starts': block_starts,
+            'block_end': block_end,
+            'outcome': outcome,
+            'horizon': horizons[bot_name],
+        }
+
+    sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(prepared, rules, size, child) for size, child in zip(sizes, seeds)]
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(tasks) == 1:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+
+    merged = {}
+    for rule_name in rules:
+        merged[rule_name] = {}
+        for bot_name in chunks[0][rule_name]:
+            merged[rule_name][bot_name] = {
+                key: np.concatenate([c[rule_name][bot_name][key] for c in chunks])
+                for key in ('terminal', 'max_dd', 'ruined')
+            }
+    return merged
+
+
+def summarize(results, streams):
+    """
+    Reduce simulated paths to a per rule x bot summary table.
+
+    Returns:
+        DataFrame with risk of ruin (%), drawdown percentiles (%) and
+        terminal-equity percentiles (USDT)
+    """
+    rows = []
+    total_capital = sum(s['bet'] * STARTING_CAPITAL_BETS for s in streams.values())
+
+    for rule_name, by_bot in results.items():
+        for bot_name, r in by_bot.items():
+            capital = total_capital if bot_name == PORTFOLIO else streams[bot_name]['bet'] * STARTING_CAPITAL_BETS
+            dd = np.percentile(r['max_dd'] * 100, PERCENTILES)
+            term = np.percentile(r['terminal'], PERCENTILES)
+            rows.append({
+                'Rule': rule_name,
+                'Bot': bot_name,
+                'Capital': capital,
+                'Risk_of_Ruin': r['ruined'].mean() * 100,
+                'DD_p50': dd[1], 'DD_p95': dd[2], 'DD_p99': dd[3],
+                'Equity_p5': term[0], 'Equity_p50': term[1], 'Equity_p95': term[2],
+            })
+
+    return pd.DataFrame(rows)
+
+
+def print_report(summary, streams, n_paths, elapsed, streaks=None):
+    """Print the simulation report, one block per sizing rule."""
+    horizons = trade_horizons(streams)
+    print("=" * 90)
+    print("MONTE CARLO POSITION SIZING - RISK OF RUIN")
+    print("=" * 90)
+    print(f"Paths: {n_paths:,} | Starting capital: {STARTING_CAPITAL_BETS} bets/bot | "
+          f"Ruin level: {RUIN_LEVEL:.0%} of capital | {elapsed:.2f}s")
+    for bot_name, s in streams.items():
+        print(f"   {bot_name:10s} → {len(s['returns']):4d} trades | bet ${s['bet']:.0f} | "
+              f"avg {s['returns'].mean():+.3f} bets/trade | {horizons[bot_name]} trades simulated")
+    print(f"⚠️  Bots are resampled independently: {PORTFOLIO} assumes no cross-bot correlation")
+
+    if streaks is not None:
+        print(f"\n🔎 Streak check ({STREAK_CHECK_PATHS:,} paths of the journal's length):")
+        print(f"{'Bot':12s} {'Loss streak obs':>16s} {'sim mean':>9s} {'sim p95':>8s} "
+              f"{'Same-outcome obs':>17s} {'sim':>6s}")
+        for _, c in streaks.iterrows():
+            print(f"{c['Bot']:12s} {c['Loss_Streak_Obs']:16d} {c['Loss_Streak_Sim']:9.2f} "
+                  f"{c['Loss_Streak_Sim_p95']:8.0f} {c['Same_Obs']:17.2f} {c['Same_Sim']:6.2f}")
+
+    for rule_name, rows in summary.groupby('Rule', sort=False):
+        print(f"\n{' ' + rule_name + ' ':-^90}")
+        print(f"{'Bot':12s} {'Capital':>8s} {'Ruin %':>7s} {'DD p50':>7s} {'DD p95':>7s} "
+              f"{'DD p99':>7s} {'Eq p5':>9s} {'Eq p50':>9s} {'Eq p95':>9s}")
+        for _, m in rows.iterrows():
+            print(f"{m['Bot']:12s} {m['Capital']:8.0f} {m['Risk_of_Ruin']:7.2f} "
+                  f"{m['DD_p50']:6.1f}% {m['DD_p95']:6.1f}% {m['DD_p99']:6.1f}% "
+                  f"{m['Equity_p5']:9.2f} {m['Equity_p50']:9.2f} {m['Equity_p95']:9.2f}")
+
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    # Optional: Bitget position-history export instead of the Phase 3/4 journals
+    if len(sys.argv) > 1:
+        df = analyze_trading_performance(Path(sys.argv[1]))['classified_df']
+        streams = build_return_streams(df, pnl_col='Net_PnL', time_col='Opening_Time')
+    else:
+        streams = build_return_streams(load_journals())
+
+    start = time.perf_counter()
+    results = run_simulation(streams)
+    elapsed = time.perf_counter() - start
+
+    print_report(summarize(results, streams), streams, N_PATHS, elapsed, check_streaks(streams))
@@ -7,9 +7,12 @@
 // - Dead zones pour éviter le bruit
 // - Double confirmation pour changer d’état
 // - Anti-spam + messages rares et utiles
+// - Timeline des régimes (regime_timeline.csv) pour analyze_regimes.py
 
+import fs from "fs";
 import fetch from "node-fetch";
 import { loadJson } from "./config/loadJson.js";
+import { getMarketBias } from "./market_bias.js";
 
 const TELEGRAM_BOT_TOKEN = process.env.TELEGRAM_BOT_TOKEN;
 const TELEGRAM_CHAT_ID   = process.env.TELEGRAM_CHAT_ID;
@@ -28,6 +31,9 @@ const DEADZONE_STRONG_HIGH  = 72;
 // Double confirmation
 const REQUIRED_CONFIRMATIONS = 2;
 
+// Timeline persistée (1 ligne par scan)
+const REGIME_FILE = "./regime_timeline.csv";
+
 // Mémoire
 let lastMQIState   = null;
 let lastMQIScore   = null;
@@ -286,6 +292,25 @@ function shouldSendMQI(score, state) {
   return true;
 }
 
+// ==========================================================
+// TIMELINE DES RÉGIMES
+// ==========================================================
+
+function persistRegime(score, state, bias) {
+  try {
+    if (!fs.existsSync(REGIME_FILE)) {
+      fs.writeFileSync(REGIME_FILE, "time;mqi_score;mqi_state;bias_label;btc_trend\n");
+    }
+    const btcTrend = bias?.btcTrend != null ? num(bias.btcTrend, 3) : "";
+    fs.appendFileSync(
+      REGIME_FILE,
+      `${new Date().toISOString()};${score};${state};${bias?.label ?? ""};${btcTrend}\n`
+    );
+  } catch (e) {
+    console.error("[MQI] Error saving regime timeline", e.message);
+  }
+}
+
 // ==========================================================
 // TELEGRAM
 // ==========================================================
@@ -317,6 +342,9 @@ async function scanMQIOnce() {
 
   const state = classifyMQI(score);
 
+  // Chaque scan est persisté, même sans alerte
+  persistRegime(score, state, await getMarketBias());
+
   console.log(
     `📡 MQI v1.1.1 — Score=${score} | State=${state} | BTC=${btcTrend1h}% ETH=${ethTrend1h}% Breadth=${breadth}%`
   );
@@ -361,7 +361,7 @@ async function scanOnce() {
     if (shouldSkipDirection(dir)) continue;
 
     // 🎯 Advanced Filters (Orderbook/Funding/Trend Block)
-    const adv = await applyAdvancedFilters(s, dir, jds);
+    const adv = await applyAdvancedFilters(s, dir, jds, null, "SWING");
     if (adv.isBlocked) {
       logDebug(`[SWING BLOCKED] ${s} — ${adv.reason}`);
       continue;